@@ -1,39 +1,82 @@
 import json
 import os
+import functools
 import uuid
 from datetime import datetime
+import orjson
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
+from sqlalchemy import bindparam, inspect, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import declared_attr
 from models import db, RefreshRecord
+from utils import utc_now
 from flask import current_app
 
+_NS_DNS = uuid.NAMESPACE_DNS
+_uuid3 = uuid.uuid3
+
 
 # Base announcement model (abstract)
 class AnnouncementBase(db.Model):
     __abstract__ = True
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    language = db.Column(db.String(16), nullable=False)
     official_id = db.Column(db.String(32), nullable=False)
-    uuid = db.Column(db.String(64), nullable=False, unique=True)
+    uuid = db.Column(db.String(64), nullable=False)
     title = db.Column(db.Text, nullable=False)
-    raw_data = db.Column(db.Text)
     content = db.Column(db.Text)
     banner_img = db.Column(db.Text)
     start_time = db.Column(db.DateTime)
     end_time = db.Column(db.DateTime)
     type = db.Column(db.String(32))
 
+    @declared_attr.directive
+    def __table_args__(cls):
+        # SQLite的索引名在整个库内唯一，需带上表名
+        table = cls.__tablename__
+        return (
+            db.UniqueConstraint("language", "uuid", name=f"uq_{table}_language_uuid"),
+            db.Index(f"ix_{table}_type_start", "language", "type", "start_time"),
+            db.Index(f"ix_{table}_active", "language", "start_time", "end_time"),
+            db.Index(f"ix_{table}_official_id", "language", "official_id"),
+            # 列表接口只取未结束的公告，按end_time范围扫描可跳过大量历史公告
+            db.Index(f"ix_{table}_end_time", "language", "end_time"),
+        )
+
     def __init__(self, **kwargs):
         super(AnnouncementBase, self).__init__(**kwargs)
-        self.uuid = self.generate_uuid()
+        if not self.uuid:
+            self.uuid = self.generate_uuid()
 
     def __repr__(self):
         return f"<Announcement {self.id}: {self.title}>"
 
     def generate_uuid(self):
-        namespace = uuid.NAMESPACE_DNS
-        name = f"{self.official_id}-{self.title}"
-        return str(uuid.uuid3(namespace, name))
+        return generate_announcement_uuid(self.official_id, self.title)
+
+
+# 原始JSON只在排查问题时使用，单独存放以减小公告主表的行宽
+class AnnouncementRawBase(db.Model):
+    __abstract__ = True
+
+    raw_data = db.Column(db.Text)
+
+    @declared_attr
+    def announcement_id(cls):
+        table = cls.__tablename__.replace("announcement_raw_", "announcements_", 1)
+        return db.Column(
+            db.Integer,
+            db.ForeignKey(f"{table}.id", ondelete="CASCADE"),
+            primary_key=True,
+        )
+
+    def __repr__(self):
+        return f"<AnnouncementRaw {self.announcement_id}>"
+
+
+def generate_announcement_uuid(official_id, title) -> str:
+    return str(_uuid3(_NS_DNS, f"{official_id}-{title}"))
 
 
 # Load languages from JSON file
@@ -45,19 +88,140 @@ def load_languages():
 
 LANGUAGES = load_languages()
 
+_fromisoformat = datetime.fromisoformat
+
+
+def parse_iso_datetime(time_str: str) -> datetime:
+    """解析ISO格式时间字符串（兼容末尾的'Z'时区标记）"""
+    if time_str.endswith("Z"):
+        time_str = time_str[:-1] + "+00:00"
+    return _fromisoformat(time_str)
+
+
+def parse_time(time_str):
+    """解析公告时间字段，无法解析时返回None"""
+    if not time_str:
+        return None
+    # fromisoformat 同样可以解析 "%Y-%m-%d %H:%M:%S" 格式
+    try:
+        return parse_iso_datetime(time_str)
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _ensure_json(value) -> str:
+    """序列化raw_data，已是JSON字符串时直接使用"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return orjson.dumps(value).decode("utf-8")
+
+
+GAMES_JSON_FILE = os.path.join(os.path.dirname(__file__), "data", "games.json")
+
+
+@functools.lru_cache(maxsize=1)
+def load_games_full():
+    """加载完整的games.json内容（每个进程只读取一次，cache_clear()后重新读取）"""
+    with open(GAMES_JSON_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 
 def load_game_ids():
     """从games.json文件加载游戏ID列表"""
     try:
-        with open("data/games.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return [game["game_id"] for game in data["games"]]
+        return [game["game_id"] for game in load_games_full()["games"]]
     except Exception as e:
         print(f"Error loading games.json: {e}")
         # 默认返回常用游戏ID
         return ["genshin", "starrail"]
 
 
+# 公告模型注册表: {game_id: model_cls}，各语言共用一张表
+ANNOUNCEMENT_MODELS = {}
+# 公告原始数据模型注册表: {game_id: model_cls}
+ANNOUNCEMENT_RAW_MODELS = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _normalize_table_lang(language: str) -> str:
+    return language.lower().replace("-", "")
+
+
+# 规范化语言代码 -> languages.json中的语言代码
+_LANGUAGE_CODES = {_normalize_table_lang(lang): lang for lang in LANGUAGES}
+
+# 旧版按语言分表时需要迁移的字段
+_LEGACY_COLUMNS = (
+    "official_id, uuid, title, content, banner_img, start_time, end_time, type"
+)
+
+
+def _ensure_indexes(game_id: str, model):
+    """补建已存在的表上缺失的索引（create_all不会修改已存在的表）"""
+    engine = db.engines[game_id]
+    for index in model.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+def _migrate_raw_data_column(game_id: str, model, raw_model):
+    """将公告主表中的raw_data列迁入原始数据表，并删除该列"""
+    engine = db.engines[game_id]
+    columns = {col["name"] for col in inspect(engine).get_columns(model.__tablename__)}
+    if "raw_data" not in columns:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"INSERT OR IGNORE INTO {raw_model.__tablename__} "
+                f"(announcement_id, raw_data) "
+                f"SELECT id, raw_data FROM {model.__tablename__} "
+                f"WHERE raw_data IS NOT NULL"
+            )
+        )
+        conn.execute(text(f"ALTER TABLE {model.__tablename__} DROP COLUMN raw_data"))
+    current_app.logger.info(f"Moved raw_data of {model.__tablename__} to side table")
+
+
+def _migrate_legacy_tables(game_id: str, model, raw_model):
+    """将旧版按语言分表(announcements_{game_id}_{lang})的数据并入合并后的公告表"""
+    engine = db.engines[game_id]
+    existing_tables = set(inspect(engine).get_table_names())
+
+    with engine.begin() as conn:
+        for table_lang, lang in _LANGUAGE_CODES.items():
+            legacy_table = f"announcements_{game_id}_{table_lang}"
+            if legacy_table not in existing_tables:
+                continue
+
+            conn.execute(
+                text(
+                    f"INSERT OR IGNORE INTO {model.__tablename__} "
+                    f"(language, {_LEGACY_COLUMNS}) "
+                    f"SELECT :language, {_LEGACY_COLUMNS} FROM {legacy_table}"
+                ),
+                {"language": lang},
+            )
+            conn.execute(
+                text(
+                    f"INSERT OR IGNORE INTO {raw_model.__tablename__} "
+                    f"(announcement_id, raw_data) "
+                    f"SELECT a.id, l.raw_data FROM {legacy_table} l "
+                    f"JOIN {model.__tablename__} a "
+                    f"ON a.language = :language AND a.uuid = l.uuid "
+                    f"WHERE l.raw_data IS NOT NULL"
+                ),
+                {"language": lang},
+            )
+            # 保留旧数据，改名后不再重复迁移
+            conn.execute(
+                text(f"ALTER TABLE {legacy_table} RENAME TO {legacy_table}_legacy")
+            )
+            current_app.logger.info(f"Migrated legacy table {legacy_table}")
+
+
 def create_announcement_tables(game_ids):
     binds = current_app.config.get("SQLALCHEMY_BINDS", {})
 
@@ -65,92 +229,124 @@ def create_announcement_tables(game_ids):
         if game_id not in binds:
             continue
 
-        for lang in LANGUAGES:
-            table_lang = lang.lower().replace("-", "")
-            table_name = f"announcements_{game_id}_{table_lang}"
+        # 检查是否已存在该模型类
+        if game_id in ANNOUNCEMENT_MODELS:
+            continue
 
-            # 检查是否已存在该模型类
-            if table_name in globals():
-                continue
+        table_name = f"announcements_{game_id}"
+        attrs = {
+            "__tablename__": table_name,
+            "__bind_key__": game_id,
+        }
 
-            attrs = {
-                "__tablename__": table_name,
-                "__bind_key__": game_id,
-            }
-
-            try:
-                model_cls = type(table_name, (AnnouncementBase,), attrs)
-                globals()[table_name] = model_cls
-            except Exception as e:
-                current_app.logger.warning(
-                    f"Failed to create table {table_name}: {str(e)}"
-                )
-                continue
+        raw_table_name = f"announcement_raw_{game_id}"
+        raw_attrs = {
+            "__tablename__": raw_table_name,
+            "__bind_key__": game_id,
+        }
+
+        try:
+            model_cls = type(table_name, (AnnouncementBase,), attrs)
+            raw_model_cls = type(raw_table_name, (AnnouncementRawBase,), raw_attrs)
+            ANNOUNCEMENT_MODELS[game_id] = model_cls
+            ANNOUNCEMENT_RAW_MODELS[game_id] = raw_model_cls
+        except Exception as e:
+            current_app.logger.warning(f"Failed to create table {table_name}: {str(e)}")
+            continue
 
         # 只为新表创建
         db.create_all(bind_key=game_id)
+        _ensure_indexes(game_id, model_cls)
+        _migrate_raw_data_column(game_id, model_cls, raw_model_cls)
+        _migrate_legacy_tables(game_id, model_cls, raw_model_cls)
+
+
+_tables_initialized = False
 
 
 # Example initialization
 def init_announcement_tables():
-    """Initialize tables for all supported games"""
+    """Initialize tables for all supported games (once per process)"""
+    global _tables_initialized
+    if _tables_initialized:
+        return
+
     game_ids = load_game_ids()  # 从JSON文件加载游戏ID
     # print("* create:", game_ids)
     create_announcement_tables(game_ids)
+    _tables_initialized = True
 
 
 # Utility functions
 def get_announcement_model(game_id: str, language: str):
-    table_lang = language.lower().replace("-", "")
-    table_name = f"announcements_{game_id}_{table_lang}"
-
-    if table_name not in globals():
+    """返回 (公告模型, 规范语言代码)，查询时需按 language 列过滤"""
+    model = ANNOUNCEMENT_MODELS.get(game_id)
+    lang = _LANGUAGE_CODES.get(_normalize_table_lang(language))
+    if model is None or lang is None:
         raise ValueError(
             f"No announcement table for game {game_id} and language {language}"
         )
+    return model, lang
+
 
-    return globals()[table_name]
+def get_announcement_raw_model(game_id: str):
+    """返回游戏对应的公告原始数据模型"""
+    raw_model = ANNOUNCEMENT_RAW_MODELS.get(game_id)
+    if raw_model is None:
+        raise ValueError(f"No announcement raw table for game {game_id}")
+    return raw_model
+
+
+def upsert_announcement_raw(game_id: str, rows: list):
+    """批量写入公告原始数据 rows: [{"announcement_id": ..., "raw_data": ...}]，不提交"""
+    if not rows:
+        return
+    raw_table = get_announcement_raw_model(game_id).__table__
+    stmt = sqlite_insert(raw_table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["announcement_id"],
+        set_={"raw_data": stmt.excluded.raw_data},
+    )
+    db.session.execute(stmt, rows)
 
 
 def add_announcement(game_id: str, language: str, announcement_data: dict):
     """添加或更新公告到适当的表"""
-    model = get_announcement_model(game_id, language)
+    model, lang = get_announcement_model(game_id, language)
 
     # 检查是否已存在相同UUID的公告
-    existing = model.query.filter_by(uuid=announcement_data.get("uuid")).first()
-
-    # 处理时间字段转换
-    def parse_time(time_str):
-        if not time_str:
-            return None
-        try:
-            return datetime.fromisoformat(time_str)
-        except (TypeError, ValueError):
-            try:
-                return datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
-            except:
-                return None
+    existing = model.query.filter_by(
+        language=lang, uuid=announcement_data.get("uuid")
+    ).first()
 
     if existing:
         # 如果已存在，更新所有字段
         existing.official_id = announcement_data.get("official_id")
         existing.title = announcement_data.get("title")
-        existing.raw_data = json.dumps(announcement_data.get("raw_data", {}))
         existing.content = announcement_data.get("content")
         existing.banner_img = announcement_data.get("banner_img")
         existing.start_time = parse_time(announcement_data.get("start_time"))
         existing.end_time = parse_time(announcement_data.get("end_time"))
         existing.type = announcement_data.get("type")
 
+        upsert_announcement_raw(
+            game_id,
+            [
+                {
+                    "announcement_id": existing.id,
+                    "raw_data": _ensure_json(announcement_data.get("raw_data") or {}),
+                }
+            ],
+        )
         db.session.commit()
         return existing
     else:
         # 如果不存在，创建新公告
         announcement = model(
+            language=lang,
             official_id=announcement_data.get("official_id"),
             uuid=announcement_data.get("uuid"),  # 确保传入uuid
             title=announcement_data.get("title"),
-            raw_data=json.dumps(announcement_data.get("raw_data", {})),
             content=announcement_data.get("content"),
             banner_img=announcement_data.get("banner_img"),
             start_time=parse_time(announcement_data.get("start_time")),
@@ -159,23 +355,55 @@ def add_announcement(game_id: str, language: str, announcement_data: dict):
         )
 
         db.session.add(announcement)
+        db.session.flush()
+        upsert_announcement_raw(
+            game_id,
+            [
+                {
+                    "announcement_id": announcement.id,
+                    "raw_data": _ensure_json(announcement_data.get("raw_data") or {}),
+                }
+            ],
+        )
         db.session.commit()
         return announcement
 
 
+# 预构建的公告查询语句: {(model_cls, by_type, active): Select}
+_ANNOUNCEMENT_STMTS = {}
+
+
+def _get_announcements_stmt(model, by_type: bool, active: bool):
+    """按过滤条件组合缓存查询语句，参数通过bindparam传入"""
+    key = (model, by_type, active)
+    stmt = _ANNOUNCEMENT_STMTS.get(key)
+    if stmt is None:
+        stmt = select(model).where(model.language == bindparam("language"))
+        if by_type:
+            stmt = stmt.where(model.type == bindparam("type"))
+        if active:
+            stmt = stmt.where(model.start_time <= bindparam("now")).where(
+                model.end_time >= bindparam("now")
+            )
+        stmt = stmt.order_by(model.start_time.desc())
+        _ANNOUNCEMENT_STMTS[key] = stmt
+    return stmt
+
+
 def get_announcements(game_id: str, language: str, **filters):
     """Get announcements with optional filters"""
-    model = get_announcement_model(game_id, language)
-    query = model.query
-
-    if filters.get("type"):
-        query = query.filter_by(type=filters["type"])
+    model, lang = get_announcement_model(game_id, language)
+    by_type = bool(filters.get("type"))
+    active = bool(filters.get("active"))
 
-    if filters.get("active"):
-        now = datetime.utcnow()
-        query = query.filter(model.start_time <= now).filter(model.end_time >= now)
+    params = {"language": lang}
+    if by_type:
+        params["type"] = filters["type"]
+    if active:
+        params["now"] = utc_now()
 
-    return query.order_by(model.start_time.desc()).all()
+    stmt = _get_announcements_stmt(model, by_type, active)
+    return db.session.execute(stmt, params).scalars().all()
 
 
 DYNAMIC_MODELS = {}
@@ -203,6 +431,9 @@ def create_refresh_tables(game_ids):
         model_cls = type(table_name, (RefreshRecord,), attrs)
         DYNAMIC_MODELS[table_name] = model_cls  # 存储到字典
 
+        # 刷新记录模型在公告表的create_all之后才注册，需单独建表
+        db.create_all(bind_key=game_id)
+
 
 def get_refresh_record_model(game_id):
     return DYNAMIC_MODELS.get(f"refresh_records_{game_id}")
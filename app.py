@@ -1,24 +1,29 @@
 from flask import Flask, request, jsonify
 import os
 import json
+import threading
 import base64
+from concurrent.futures import ProcessPoolExecutor
 from werkzeug.exceptions import MethodNotAllowed
+from werkzeug.security import generate_password_hash
 from datetime import datetime
 from models import db, Game, User
 from ann_model import (
     get_announcement_model,
     init_announcement_tables,
+    load_games_full,
     create_refresh_tables,
 )
-from utils import decode_request_data, make_json_response
+from utils import decode_request_data, make_json_response, OrjsonProvider
 from auth import login, logout, logout_all, token_required
 from services.announcement_service import AnnouncementService
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.combining import OrTrigger
+from apscheduler.triggers.cron import CronTrigger
 
 app = Flask(__name__)
-app.json.ensure_ascii = False
+app.json = OrjsonProvider(app)
 app.config.from_object("config")
-GAME_JSON_FILE = os.path.join(os.path.dirname(__file__), "data", "games.json")
 LANG_JSON_FILE = os.path.join(os.path.dirname(__file__), "data", "languages.json")
 announcement_service = AnnouncementService()
 
@@ -38,7 +43,8 @@ def create_tables():
             db.session.add(Game(**game))
         db.session.commit()
 
-    game_ids = [game.game_id for game in Game.query.all()]
+    game_ids = [game_id for (game_id,) in db.session.query(Game.game_id)]
+    reload_games_by_id()
     init_announcement_tables()
     create_refresh_tables(game_ids)
 
@@ -55,6 +61,34 @@ def load_supported_languages():
 
 SUPPORTED_LANGUAGES = load_supported_languages()
 
+# Game表进程内缓存: {game_id: (game_id, name, enabled)}
+# 重新加载时整体替换字典，读取方无需加锁也不会看到加载到一半的数据
+_GAMES_BY_ID = {}
+_games_loaded = False
+_GAMES_LOCK = threading.Lock()
+
+
+def reload_games_by_id():
+    """从数据库重新加载Game表缓存"""
+    global _GAMES_BY_ID, _games_loaded
+    with _GAMES_LOCK:
+        games_by_id = {
+            game_id: (game_id, name, bool(enabled))
+            for game_id, name, enabled in db.session.query(
+                Game.game_id, Game.name, Game.enabled
+            )
+        }
+        _GAMES_BY_ID = games_by_id
+        _games_loaded = True
+    return games_by_id
+
+
+def get_games_by_id():
+    """获取Game表缓存，首次使用时从数据库加载"""
+    if not _games_loaded:
+        return reload_games_by_id()
+    return _GAMES_BY_ID
+
 
 @app.route("/api/announcements", methods=["GET"])
 def get_announcements():
@@ -105,9 +139,7 @@ def get_announcements():
             )
 
         # Validate game IDs
-        valid_games = {
-            game.game_id for game in Game.query.filter(Game.game_id.in_(games)).all()
-        }
+        valid_games = set(games) & get_games_by_id().keys()
         invalid_games = set(games) - valid_games
 
         if invalid_games:
@@ -209,13 +241,13 @@ def handle_errors(error):
 @app.route("/api/games", methods=["GET"])
 def get_games():
     try:
-        # 从JSON文件加载基础游戏数据
-        with open(GAME_JSON_FILE, "r", encoding="utf-8") as f:
-            games_data = json.load(f)
+        # 从缓存加载基础游戏数据
+        games_data = load_games_full()
 
         # 从数据库获取已启用的游戏ID
         enabled_games = {
-            game.game_id: game for game in Game.query.filter_by(enabled=1).all()
+            game_id
+            for (game_id,) in db.session.query(Game.game_id).filter_by(enabled=1)
         }
 
         # 过滤只返回启用的游戏
@@ -233,6 +265,22 @@ def get_games():
         return make_json_response(code=500, message=f"Server error: {str(e)}")
 
 
+@app.route("/api/games/reload", methods=["POST"])
+@token_required
+def handle_reload_games(current_user):
+    if not current_user.is_admin:
+        return make_json_response(code=403, message="Forbidden")
+    reload_games_by_id()
+    try:
+        load_games_full.cache_clear()
+        games_data = load_games_full()
+    except FileNotFoundError:
+        return make_json_response(code=404, message="Game data file not found")
+    return make_json_response(
+        message="Game data reloaded", data={"count": len(games_data["games"])}
+    )
+
+
 @app.route("/api/auth/login", methods=["POST"])
 def handle_login():
     return login()
@@ -278,12 +326,29 @@ def is_plaintext_password(password):
     return True
 
 
+# 待迁移用户不超过该数量时在当前进程内计算哈希
+_INLINE_HASH_LIMIT = 4
+
+
 def migrate_plaintext_passwords():
-    users = User.query.all()
-    for user in users:
-        if is_plaintext_password(user.password_hash):
-            print(f"Migrating password for user: {user.user_name}")
-            user.set_password(user.password_hash)
+    candidates = [
+        user for user in User.query.all() if is_plaintext_password(user.password_hash)
+    ]
+    if not candidates:
+        return
+
+    passwords = [user.password_hash for user in candidates]
+    if len(candidates) <= _INLINE_HASH_LIMIT:
+        # 待迁移用户很少时直接计算，省去启动进程池的开销
+        hashes = [generate_password_hash(password) for password in passwords]
+    else:
+        # 密码哈希是CPU密集型计算，使用多进程并行
+        workers = min(len(candidates), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            hashes = list(executor.map(generate_password_hash, passwords))
+    for user, password_hash in zip(candidates, hashes):
+        print(f"Migrating password for user: {user.user_name}")
+        user.password_hash = password_hash
     db.session.commit()
 
 
@@ -293,19 +358,25 @@ def scheduled_refresh():
         announcement_service.refresh_all_games()
 
 
-# 启动定时任务
+# 启动定时任务（9:00、11:10、16:00、18:00、22:00）
 scheduler = BackgroundScheduler()
-scheduler.add_job(scheduled_refresh, "cron", hour=9, minute=0)
-scheduler.add_job(scheduled_refresh, "cron", hour=11, minute=10)
-scheduler.add_job(scheduled_refresh, "cron", hour=16, minute=0)
-scheduler.add_job(scheduled_refresh, "cron", hour=18, minute=0)
-scheduler.add_job(scheduled_refresh, "cron", hour=22, minute=0)
-scheduler.start()
+scheduler.add_job(
+    scheduled_refresh,
+    OrTrigger(
+        [
+            CronTrigger(hour="9,16,18,22", minute=0),
+            CronTrigger(hour=11, minute=10),
+        ]
+    ),
+)
 
 if __name__ == "__main__":
     with app.app_context():
         db.init_app(app)
         create_tables()
         migrate_plaintext_passwords()
-        init_announcement_tables()
+    # 密码迁移可能创建进程池，调度线程需在其之后启动，避免在多线程状态下fork
+    scheduler.start()
     app.run(host="0.0.0.0", port=8182, debug=True)
+else:
+    scheduler.start()
@@ -1,16 +1,18 @@
-import random
-import string
-from datetime import datetime
+import secrets
+from datetime import timedelta
 from functools import wraps
 from flask import request
+from sqlalchemy import func
 from models import User, UserToken, db
-from utils import make_json_response  # Assuming this is now in utils.py
+from utils import make_json_response, utc_now  # Assuming this is now in utils.py
+
+# token 最后使用时间的最小写入间隔
+LAST_USED_UPDATE_INTERVAL = timedelta(seconds=60)
 
 
 def generate_token(length=16):
-    """生成随机 token (小写字母+数字)"""
-    chars = string.ascii_lowercase + string.digits
-    return "".join(random.choice(chars) for _ in range(length))
+    """生成随机 token (小写十六进制字符)"""
+    return secrets.token_hex(length // 2)
 
 
 def token_required(f):
@@ -32,9 +34,14 @@ def token_required(f):
                 message="Invalid token"
             )
 
-        # 更新最后使用时间
-        user_token.last_used = datetime.utcnow()
-        db.session.commit()
+        # 更新最后使用时间（节流，避免每个请求都写库）
+        now = utc_now()
+        if (
+            user_token.last_used is None
+            or now - user_token.last_used > LAST_USED_UPDATE_INTERVAL
+        ):
+            user_token.last_used = now
+            db.session.commit()
 
         # 将用户对象传递给路由
         return f(user_token.user, *args, **kwargs)
@@ -61,18 +68,27 @@ def login():
         )
 
     # 检查用户已有 token 数量
-    tokens = user.tokens
-    if len(tokens) >= 10:
+    token_count = (
+        db.session.query(func.count(UserToken.id))
+        .filter_by(user_id=user.id)
+        .scalar()
+    )
+    if token_count >= 10:
         # 删除最早创建的 token
-        oldest_token = sorted(tokens, key=lambda t: t.created_at)[0]
+        oldest_token = (
+            UserToken.query.filter_by(user_id=user.id)
+            .order_by(UserToken.created_at.asc())
+            .first()
+        )
         db.session.delete(oldest_token)
 
     # 创建新 token
+    now = utc_now()
     new_token = UserToken(
         user_id=user.id,
         token=generate_token(),
-        created_at=datetime.utcnow(),
-        last_used=datetime.utcnow(),
+        created_at=now,
+        last_used=now,
     )
     db.session.add(new_token)
     db.session.commit()
@@ -96,7 +112,9 @@ def logout(token):
 
 
 def logout_all(user):
-    """注销用户所有 token"""
-    UserToken.query.filter_by(user_id=user.id).delete()
+    """注销用户所有 token，返回删除的数量"""
+    deleted = UserToken.query.filter_by(user_id=user.id).delete(
+        synchronize_session=False
+    )
     db.session.commit()
-    return True
\ No newline at end of file
+    return deleted
\ No newline at end of file
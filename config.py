@@ -9,6 +9,16 @@ os.makedirs(INSTANCE_DIR, exist_ok=True)  # 自动创建目录
 SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(INSTANCE_DIR, "wuicc.sqlite3")
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# 连接池配置（同样作用于各游戏的bind）
+SQLALCHEMY_ENGINE_OPTIONS = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+    "connect_args": {"check_same_thread": False, "timeout": 30},
+}
+
 # 从JSON文件读取游戏数据库配置
 def load_database_binds():
     binds = {}
@@ -1,8 +1,8 @@
-from datetime import datetime
 from ann_model import (
     get_announcement_model,
     add_announcement,
-    get_announcements
+    get_announcements,
+    parse_iso_datetime,
 )
 
 def fetch_game_announcements(game_id: str, lang: str):
@@ -20,8 +20,8 @@ def create_announcement(game_id: str, lang: str, data: dict):
     """服务层：创建公告"""
     try:
         # 数据预处理（如时间格式转换）
-        data['start_time'] = datetime.fromisoformat(data['start_time'])
-        data['end_time'] = datetime.fromisoformat(data['end_time'])
+        data['start_time'] = parse_iso_datetime(data['start_time'])
+        data['end_time'] = parse_iso_datetime(data['end_time'])
         
         announcement = add_announcement(game_id, lang, data)
         return {'code': 200, 'data': announcement.to_dict()}
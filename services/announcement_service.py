@@ -1,24 +1,62 @@
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 import logging
+import threading
+from collections import OrderedDict
+import time
+from functools import cached_property
+from flask import current_app
 from models import db, Game, RefreshLog
-from services.fetch.mihoyo_fetcher import MihoyoFetcher
-from services.fetch.kuro_fetcher import KuroFetcher
+from utils import utc_now
+from services.fetch.mihoyo_fetcher import MihoyoFetcher, get_mihoyo_fetcher
+from services.fetch.kuro_fetcher import (
+    KuroFetcher,
+    get_kuro_fetcher,
+    load_announcement_links,
+)
 from services.parse.genshin_parser import GenshinParser
 from services.parse.starrail_parser import StarRailParser
 from services.parse.zenless_parser import ZenlessParser
 from services.parse.wuthering_parser import WutheringParser
-from ann_model import get_announcement_model, get_refresh_record_model
+from sqlalchemy import insert, update
+from ann_model import (
+    generate_announcement_uuid,
+    get_announcement_model,
+    get_refresh_record_model,
+    upsert_announcement_raw,
+)
+
+# 定时刷新的语言列表
+REFRESH_LANGUAGES = ("zh-Hans", "en", "ja", "zh-Hant")
+
+# 进程内共享的公告缓存: {cache_key: (data, 过期时刻 time.monotonic())}
+# 按最近使用顺序排列，超过上限时淘汰最久未使用的条目
+_ANNOUNCEMENT_CACHE: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+_ANNOUNCEMENT_CACHE_MAXSIZE = 64
+
+# IN (...) 子句每批的参数个数，避免超出数据库的绑定参数上限
+_IN_CLAUSE_CHUNK_SIZE = 500
+_ANNOUNCEMENT_CACHE_LOCK = threading.RLock()
 
 
 class AnnouncementService:
     """公告服务类，负责获取、解析和存储公告数据"""
 
+    # 游戏ID -> 获取方法名
+    _FETCH_METHODS = {
+        "genshin": "_fetch_genshin_announcements",
+        "starrail": "_fetch_starrail_announcements",
+        "zenless": "_fetch_zenless_announcements",
+        "wuthering": "_fetch_wuthering_announcements",
+    }
+
     def __init__(self, debug: bool = False):
-        # 缓存结构: {cache_key: (data, expiration_time)}
-        self._cache: Dict[str, Tuple[Any, datetime]] = {}
-        self._cache_ttl = timedelta(hours=1)  # 默认缓存1小时
+        # 缓存在同一进程的所有服务实例间共享
+        self._cache = _ANNOUNCEMENT_CACHE
+        self._cache_lock = _ANNOUNCEMENT_CACHE_LOCK
+        self._cache_ttl = 3600.0  # 默认缓存1小时（秒）
         self._debug = debug
 
         # 缓存统计
@@ -26,39 +64,31 @@ class AnnouncementService:
         self._cache_misses = 0
         self._cache_expirations = 0
 
-        # 初始化各组件
-        self._mihoyo_fetcher = MihoyoFetcher()
-        self._kuro_fetcher = KuroFetcher()
-        self._genshin_parser = GenshinParser()
-        self._starrail_parser = StarRailParser()
-        self._zenless_parser = ZenlessParser()
-        self._wuthering_parser = WutheringParser()
-
         # 配置日志
         self._setup_logging()
         self._log("AnnouncementService initialized", level="detail")
-        self._cache = {}  # 内存缓存
-        self._debug = debug  # 调试开关
-        self._mihoyo_fetcher = MihoyoFetcher()
-        self._kuro_fetcher = KuroFetcher()
-        self._genshin_parser = GenshinParser()
-        self._starrail_parser = StarRailParser()
-        self._zenless_parser = ZenlessParser()
-        self._wuthering_parser = WutheringParser()
 
-        # 配置日志
-        self._setup_logging()
-        self._log("AnnouncementService initialized", level="detail")
+    # 获取器在首次调用对应 _fetch_* 时才创建，只读数据库的实例无需构造；
+    # 同一进程内的服务实例共用同一个获取器及其会话连接池
+    @cached_property
+    def _mihoyo_fetcher(self) -> MihoyoFetcher:
+        return get_mihoyo_fetcher()
+
+    @cached_property
+    def _kuro_fetcher(self) -> KuroFetcher:
+        return get_kuro_fetcher()
 
     def _setup_logging(self):
         """配置日志系统"""
         self.logger = logging.getLogger(__name__)
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        # logger 按模块名全局共享，只在首次创建服务时添加处理器，避免日志重复输出
+        if not self.logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+            )
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
 
         if self._debug:
             self.logger.setLevel(logging.DEBUG)
@@ -78,9 +108,9 @@ class AnnouncementService:
     def _load_announcement_links(self) -> Dict:
         """从ann_link.json加载公告链接"""
         try:
-            with open("data/ann_link.json", "r", encoding="utf-8") as f:
-                self._log("Successfully loaded announcement links", "detail")
-                return json.load(f)
+            links = load_announcement_links()
+            self._log("Successfully loaded announcement links", "detail")
+            return links
         except Exception as e:
             self._log(f"Error loading announcement links: {e}", "error")
             return {}
@@ -88,7 +118,10 @@ class AnnouncementService:
     def _should_refresh(self, game_id: str, lang: str) -> bool:
         """检查是否需要刷新特定语言的公告"""
         try:
-            self._log(f"Checking if refresh is needed for {game_id} {lang}", "debug")
+            if self._debug:
+                self._log(
+                    f"Checking if refresh is needed for {game_id} {lang}", "debug"
+                )
             model = get_refresh_record_model(game_id)
             if not model:
                 self._log(f"RefreshRecord model for {game_id} not found", "error")
@@ -97,148 +130,206 @@ class AnnouncementService:
             record = model.query.filter_by(language=lang).first()
 
             if not record:
-                self._log(
-                    f"No refresh record found for {game_id} {lang}, will refresh",
-                    "debug",
-                )
+                if self._debug:
+                    self._log(
+                        f"No refresh record found for {game_id} {lang}, will refresh",
+                        "debug",
+                    )
                 return True
 
             if record.last_refresh is None:
-                self._log(
-                    f"Refresh record exists but no last_refresh time for {game_id} {lang}, will refresh",
-                    "debug",
-                )
+                if self._debug:
+                    self._log(
+                        f"Refresh record exists but no last_refresh time for {game_id} {lang}, will refresh",
+                        "debug",
+                    )
                 return True
 
             game = Game.query.filter_by(game_id=game_id).first()
             if game and game.force_refresh == 1:
-                self._log(
-                    f"Force refresh flag set for {game_id}, will refresh", "debug"
-                )
+                if self._debug:
+                    self._log(
+                        f"Force refresh flag set for {game_id}, will refresh", "debug"
+                    )
                 game.force_refresh = 0
                 db.session.commit()
                 return True
 
-            refresh_needed = datetime.utcnow() - record.last_refresh > timedelta(
-                hours=12
-            )
-            self._log(
-                f"Refresh check for {game_id} {lang}: {refresh_needed} (last refresh: {record.last_refresh})",
-                "debug",
-            )
+            refresh_needed = utc_now() - record.last_refresh > timedelta(hours=12)
+            if self._debug:
+                self._log(
+                    f"Refresh check for {game_id} {lang}: {refresh_needed} (last refresh: {record.last_refresh})",
+                    "debug",
+                )
             return refresh_needed
 
         except Exception as e:
             self._log(f"[ERROR in _should_refresh] {repr(e)}", "error")
             return True
 
-    def _update_refresh_time(self, game_id: str, lang: str, success: bool = True):
-        """更新刷新记录"""
+    def _update_refresh_time(
+        self, game_id: str, lang: str, success: bool = True, commit: bool = True
+    ):
+        """
+        更新刷新记录
+
+        commit=False 时在保存点中写入、由调用方统一提交；写入失败只回滚该保存点，
+        不影响同一事务中已写入的公告
+        """
         try:
             self._log(
                 f"Updating refresh time for {game_id} {lang}, success: {success}",
                 "debug",
             )
-            model = get_refresh_record_model(game_id)
-            if not model:
-                self._log(f"RefreshRecord model for {game_id} not found", "error")
-                raise ValueError(f"RefreshRecord model for {game_id} not found")
-
-            record = model.query.filter_by(language=lang).first()
-            if not record:
-                record = model(language=lang)
-                db.session.add(record)
-                self._log(f"Created new refresh record for {game_id} {lang}", "debug")
-
-            record.last_refresh = datetime.utcnow()
-            record.success = success
-            db.session.commit()
+            if commit:
+                self._write_refresh_record(game_id, lang, success)
+                db.session.commit()
+            else:
+                with db.session.begin_nested():
+                    self._write_refresh_record(game_id, lang, success)
             self._log(
                 f"Successfully updated refresh time for {game_id} {lang}", "debug"
             )
 
         except Exception as e:
             self._log(f"[ERROR in _update_refresh_time] {repr(e)}", "error")
-            db.session.rollback()
+            if commit:
+                db.session.rollback()
+
+    def _write_refresh_record(self, game_id: str, lang: str, success: bool):
+        """在当前事务中写入刷新记录（不提交）"""
+        model = get_refresh_record_model(game_id)
+        if not model:
+            self._log(f"RefreshRecord model for {game_id} not found", "error")
+            raise ValueError(f"RefreshRecord model for {game_id} not found")
+
+        record = model.query.filter_by(language=lang).first()
+        if not record:
+            record = model(language=lang)
+            db.session.add(record)
+            self._log(f"Created new refresh record for {game_id} {lang}", "debug")
+
+        record.last_refresh = utc_now()
+        record.success = success
+
+    def _parse_time(self, time_str):
+        """转换时间格式（"%Y-%m-%d %H:%M:%S" 可直接由 fromisoformat 解析）"""
+        if not time_str:
+            return None
+        if isinstance(time_str, datetime):  # 已经是日期对象
+            return time_str
+        try:
+            return datetime.fromisoformat(time_str)
+        except (TypeError, ValueError) as e:
+            self._log(f"Error parsing time {time_str}: {e}", "warning")
+            return None
 
-    def _store_announcements(self, game_id: str, lang: str, announcements: List[Dict]):
-        """存储公告到数据库（更新已存在的公告）"""
-        self._log(
-            f"Storing announcements for {game_id} {lang}, count: {len(announcements)}",
-            "debug",
-        )
-        model = get_announcement_model(game_id, lang)
+    def _store_announcements(
+        self, game_id: str, lang: str, announcements: List[Dict], commit: bool = True
+    ):
+        """
+        存储公告到数据库（更新已存在的公告）
 
-        # 获取所有现有公告的ID映射 {official_id: announcement_object}
-        existing_announcements = {
-            str(ann.official_id): ann for ann in model.query.all()
-        }
-        self._log(
-            f"Found {len(existing_announcements)} existing announcements in DB for {game_id} {lang}",
-            "debug",
+        commit=False 时由调用方统一提交，出错时向上抛出
+        """
+        if self._debug:
+            self._log(
+                f"Storing announcements for {game_id} {lang}, count: {len(announcements)}",
+                "debug",
+            )
+        model, lang_code = get_announcement_model(game_id, lang)
+
+        # 只查询本次传入公告的ID映射 {official_id: 主键id}
+        incoming_ids = list(
+            {
+                str(ann.get("ann_id") or ann.get("official_id", ""))
+                for ann in announcements
+            }
         )
+        existing_announcements = {}
+        for start in range(0, len(incoming_ids), _IN_CLAUSE_CHUNK_SIZE):
+            chunk = incoming_ids[start : start + _IN_CLAUSE_CHUNK_SIZE]
+            existing_announcements.update(
+                (str(official_id), pk)
+                for official_id, pk in db.session.query(model.official_id, model.id)
+                .filter(model.language == lang_code)
+                .filter(model.official_id.in_(chunk))
+            )
+        if self._debug:
+            self._log(
+                f"Found {len(existing_announcements)} existing announcements in DB for {game_id} {lang}",
+                "debug",
+            )
 
-        new_announcements = []
-        updated_count = 0
+        new_rows = []
+        update_rows = []
+        # 原始JSON写入单独的原始数据表，与new_rows/update_rows按顺序一一对应
+        new_raw = []
+        update_raw = []
 
         for ann in announcements:
             ann_id = str(ann.get("ann_id") or ann.get("official_id", ""))
-            existing_ann = existing_announcements.get(ann_id)
-
-            # 转换时间格式
-            def parse_time(time_str):
-                if not time_str:
-                    return None
-                if isinstance(time_str, datetime):  # 已经是日期对象
-                    return time_str
-                try:
-                    return datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
-                except (TypeError, ValueError) as e:
-                    self._log(f"Error parsing time {time_str}: {e}", "warning")
-                    return None
+            existing_pk = existing_announcements.get(ann_id)
 
             announcement_data = {
+                "language": lang_code,
                 "official_id": ann.get("ann_id", "") or ann.get("official_id", ""),
                 "title": ann.get("title", ""),
                 "content": ann.get("content", ""),
                 "banner_img": ann.get("bannerImage", ""),
-                "start_time": parse_time(ann.get("start_time")),
-                "end_time": parse_time(ann.get("end_time")),
+                "start_time": self._parse_time(ann.get("start_time")),
+                "end_time": self._parse_time(ann.get("end_time")),
                 "type": ann.get("event_type", "event"),
-                "raw_data": json.dumps(ann, ensure_ascii=False),
             }
-
-            if existing_ann:
-                # 更新现有公告
-                existing_ann.title = announcement_data["title"]
-                existing_ann.content = announcement_data["content"]
-                existing_ann.banner_img = announcement_data["banner_img"]
-                existing_ann.start_time = announcement_data["start_time"]
-                existing_ann.end_time = announcement_data["end_time"]
-                existing_ann.type = announcement_data["type"]
-                existing_ann.raw_data = announcement_data["raw_data"]
-                updated_count += 1
-                self._log(f"Updated existing announcement: {ann_id}", "debug")
+            raw_data = orjson.dumps(ann, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+            if existing_pk is not None:
+                # 更新现有公告（按主键批量UPDATE）
+                announcement_data["id"] = existing_pk
+                update_rows.append(announcement_data)
+                update_raw.append(
+                    {"announcement_id": existing_pk, "raw_data": raw_data}
+                )
+                if self._debug:
+                    self._log(f"Updated existing announcement: {ann_id}", "debug")
             else:
-                # 添加新公告
-                announcement = model(**announcement_data)
-                new_announcements.append(announcement)
-                self._log(
-                    f"Prepared new announcement for storage: {ann_id}",
-                    "debug",
+                # 添加新公告（批量INSERT不经过模型__init__，需自行生成uuid）
+                announcement_data["uuid"] = generate_announcement_uuid(
+                    announcement_data["official_id"], announcement_data["title"]
                 )
+                new_rows.append(announcement_data)
+                new_raw.append(raw_data)
+                if self._debug:
+                    self._log(
+                        f"Prepared new announcement for storage: {ann_id}",
+                        "debug",
+                    )
 
         try:
-            if new_announcements:
-                db.session.bulk_save_objects(new_announcements)
-            db.session.commit()
-            self._log(
-                f"Added {len(new_announcements)} new and updated {updated_count} existing announcements for {game_id} {lang}",
-                "detail",
-            )
+            if update_rows:
+                db.session.execute(update(model), update_rows)
+            if new_rows:
+                new_ids = db.session.execute(
+                    insert(model).returning(model.id, sort_by_parameter_order=True),
+                    new_rows,
+                ).scalars()
+                update_raw.extend(
+                    {"announcement_id": pk, "raw_data": raw_data}
+                    for pk, raw_data in zip(new_ids, new_raw)
+                )
+            upsert_announcement_raw(game_id, update_raw)
+            if commit:
+                db.session.commit()
+            if self._debug:
+                self._log(
+                    f"Added {len(new_rows)} new and updated {len(update_rows)} existing announcements for {game_id} {lang}",
+                    "detail",
+                )
         except Exception as e:
             db.session.rollback()
             self._log(f"Error saving announcements for {game_id} {lang}: {e}", "error")
+            if not commit:
+                raise
 
     # def _fetch_genshin_announcements(self, lang: str) -> List[Dict]:
     #     """获取原神公告数据"""
@@ -260,7 +351,11 @@ class AnnouncementService:
     #         return []
 
     def get_announcements(
-        self, game_id: str, lang: str, force_refresh: bool = False
+        self,
+        game_id: str,
+        lang: str,
+        force_refresh: bool = False,
+        refresh_updates: Optional[List[Tuple[str, str, bool]]] = None,
     ) -> List[Dict]:
         """
         获取游戏公告数据（带智能缓存机制）
@@ -269,6 +364,7 @@ class AnnouncementService:
             game_id: 游戏ID（如 'genshin'/'starrail'）
             lang: 语言代码（如 'zh-Hans'/'en'）
             force_refresh: 是否强制跳过缓存刷新数据
+            refresh_updates: 若提供，刷新记录追加到该列表由调用方批量写入，而不是立即提交
 
         Returns:
             公告数据列表，格式示例：
@@ -285,11 +381,11 @@ class AnnouncementService:
         cache_key = f"{game_id}_{lang}"
 
         # === 1. 调试日志：记录请求开始 ===
-        self._log(
-            f"▶ 开始获取公告 [游戏: {game_id}, 语言: {lang}, 强制刷新: {force_refresh}]",
-            "debug",
-        )
         if self._debug:
+            self._log(
+                f"▶ 开始获取公告 [游戏: {game_id}, 语言: {lang}, 强制刷新: {force_refresh}]",
+                "debug",
+            )
             self._log_cache_stats()  # 输出当前缓存状态
 
         # === 2. 强制刷新处理 ===
@@ -299,16 +395,18 @@ class AnnouncementService:
 
         # === 3. 检查是否需要刷新 ===
         need_refresh = force_refresh or self._should_refresh(game_id, lang)
-        self._log(
-            f"🔄 刷新检查结果: {'需要刷新' if need_refresh else '使用现有数据'}",
-            "debug",
-        )
+        if self._debug:
+            self._log(
+                f"🔄 刷新检查结果: {'需要刷新' if need_refresh else '使用现有数据'}",
+                "debug",
+            )
 
         # === 4. 尝试从缓存获取 ===
         if not need_refresh:
             cached_data = self._get_from_cache(cache_key)
             if cached_data is not None and not force_refresh:
-                self._log(f"💾 使用缓存数据（{len(cached_data)}条公告）", "debug")
+                if self._debug:
+                    self._log(f"💾 使用缓存数据（{len(cached_data)}条公告）", "debug")
                 self._log_cache_stats()  # 调试统计
                 return cached_data
 
@@ -319,34 +417,33 @@ class AnnouncementService:
                 self._log("⏳ 正在从API获取最新公告...", "detail")
 
                 # 根据游戏类型调用不同的获取方法
-                if game_id == "genshin":
-                    announcements = self._fetch_genshin_announcements(lang)
-                elif game_id == "starrail":
-                    announcements = self._fetch_starrail_announcements(lang)
-                elif game_id == "zenless":
-                    announcements = self._fetch_zenless_announcements(lang)
-                elif game_id == "wuthering":
-                    announcements = self._fetch_wuthering_announcements(lang)
-                else:
+                fetch_method = self._FETCH_METHODS.get(game_id)
+                if fetch_method is None:
                     raise ValueError(f"未知游戏ID: {game_id}")
+                announcements = getattr(self, fetch_method)(lang)
 
                 if announcements:
-                    self._log(f"✅ 获取到 {len(announcements)} 条新公告", "detail")
-                    # 存储到数据库
-                    self._store_announcements(game_id, lang, announcements)
-                    self._update_refresh_time(game_id, lang, True)
-                    # 更新缓存
-                    # self._set_to_cache(cache_key, announcements)
+                    if self._debug:
+                        self._log(f"✅ 获取到 {len(announcements)} 条新公告", "detail")
+                    # 公告与刷新记录在同一事务中写入，只提交一次；
+                    # 刷新记录写在保存点中，写入失败不会回滚公告
+                    self._store_announcements(
+                        game_id, lang, announcements, commit=False
+                    )
+                    if refresh_updates is not None:
+                        refresh_updates.append((game_id, lang, True))
+                    else:
+                        self._update_refresh_time(game_id, lang, True, commit=False)
+                    db.session.commit()
                 else:
                     self._log("⚠️ 从API获取到空公告列表", "warning")
 
             except Exception as e:
+                db.session.rollback()
                 self._log(f"❌ API刷新失败: {str(e)}", "error")
                 need_refresh = False  # 失败时降级使用现有数据
 
-        # === 6. 从数据库获取数据（刷新失败或不需要刷新时） ===
-        # if not need_refresh or not announcements:
-        # if not announcements:
+        # === 6. 从数据库获取数据（包含本次未出现在上游列表中但仍有效的公告） ===
         self._log("⏳ 从数据库加载公告...", "debug")
         announcements = self._get_from_database(game_id, lang)
         if announcements:
@@ -358,65 +455,159 @@ class AnnouncementService:
             return []
 
         # === 8. 调试日志：记录请求结束 ===
-        self._log(f"✔️ 返回 {len(announcements)} 条公告", "debug")
         if self._debug:
+            self._log(f"✔️ 返回 {len(announcements)} 条公告", "debug")
             self._log_cache_stats()  # 输出最终缓存状态
             self._log("════════════════════════════════", "debug")
 
         return announcements
 
-    def refresh_all_games(self):
-        """刷新所有游戏的公告数据"""
+    def refresh_all_games(self, max_workers: int = 8):
+        """刷新所有游戏的公告数据（按游戏×语言并行刷新）"""
         self._log("Starting refresh_all_games operation", "detail")
-        games = Game.query.filter_by(enabled=1).all()
-        self._log(f"Found {len(games)} enabled games to refresh", "debug")
+        game_ids = [
+            game_id
+            for (game_id,) in db.session.query(Game.game_id).filter_by(enabled=1)
+        ]
+        self._log(f"Found {len(game_ids)} enabled games to refresh", "debug")
+        if not game_ids:
+            return
 
-        for game in games:
-            for lang in ["zh-Hans", "en", "ja", "zh-Hant"]:
+        app = current_app._get_current_object()
+        tasks = [(game_id, lang) for game_id in game_ids for lang in REFRESH_LANGUAGES]
+        refresh_updates: List[Tuple[str, str, bool]] = []
+        # 解析器在解析过程中保存状态，各 _fetch_* 方法每次解析都使用新的解析器实例，
+        # 因此同一游戏的不同语言可以并行刷新
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            futures = {
+                executor.submit(
+                    self._refresh_one, app, game_id, lang, refresh_updates
+                ): (game_id, lang)
+                for game_id, lang in tasks
+            }
+            for future in as_completed(futures):
+                game_id, lang = futures[future]
                 try:
-                    self._log(f"Refreshing {game.game_id} {lang}", "debug")
-                    self.get_announcements(game.game_id, lang, force_refresh=True)
+                    future.result()
                 except Exception as e:
-                    self._log(f"Error refreshing {game.game_id} {lang}: {e}", "error")
+                    self._log(f"Error refreshing {game_id} {lang}: {e}", "error")
+
+        self._flush_refresh_times(refresh_updates)
+
+    def _refresh_one(self, app, game_id: str, lang: str, refresh_updates: List):
+        """在独立的应用上下文（独立数据库会话）中刷新单个游戏的单个语言"""
+        with app.app_context():
+            self._log(f"Refreshing {game_id} {lang}", "debug")
+            self.get_announcements(
+                game_id, lang, force_refresh=True, refresh_updates=refresh_updates
+            )
+
+    def _preload_refresh_state(self, game_ids) -> Dict[str, Dict[str, int]]:
+        """每个游戏一次查询，预取已有刷新记录 {game_id: {language: record_id}}"""
+        state = {}
+        for game_id in game_ids:
+            model = get_refresh_record_model(game_id)
+            if not model:
+                continue
+            state[game_id] = {
+                language: record_id
+                for language, record_id in db.session.query(model.language, model.id)
+            }
+        return state
+
+    def _flush_refresh_times(self, refresh_updates: List[Tuple[str, str, bool]]):
+        """批量写入刷新记录：每个游戏一次 INSERT/UPDATE executemany，最后统一提交"""
+        if not refresh_updates:
+            return
+        try:
+            by_game: Dict[str, List[Tuple[str, bool]]] = {}
+            for game_id, lang, success in refresh_updates:
+                by_game.setdefault(game_id, []).append((lang, success))
+
+            state = self._preload_refresh_state(by_game)
+            now = utc_now()
+            for game_id, entries in by_game.items():
+                model = get_refresh_record_model(game_id)
+                if not model:
+                    self._log(f"RefreshRecord model for {game_id} not found", "error")
+                    continue
+                existing = state.get(game_id, {})
+                new_rows, update_rows = [], []
+                for lang, success in entries:
+                    record_id = existing.get(lang)
+                    if record_id is None:
+                        new_rows.append(
+                            {"language": lang, "last_refresh": now, "success": success}
+                        )
+                    else:
+                        update_rows.append(
+                            {"id": record_id, "last_refresh": now, "success": success}
+                        )
+                if new_rows:
+                    db.session.execute(insert(model), new_rows)
+                if update_rows:
+                    db.session.execute(update(model), update_rows)
+
+            db.session.commit()
+            self._log(f"Updated {len(refresh_updates)} refresh records", "debug")
+        except Exception as e:
+            self._log(f"[ERROR in _flush_refresh_times] {repr(e)}", "error")
+            db.session.rollback()
 
     def _get_from_database(self, game_id: str, lang: str) -> List[Dict]:
         """从数据库获取格式化后的公告数据（不返回已结束的活动）"""
-        self._log(f"Getting announcements from DB for {game_id} {lang}", "debug")
-        model = get_announcement_model(game_id, lang)
+        if self._debug:
+            self._log(f"Getting announcements from DB for {game_id} {lang}", "debug")
+        model, lang_code = get_announcement_model(game_id, lang)
 
         # 获取当前时间
-        now = datetime.utcnow()
+        now = utc_now()
 
-        # 只查询未结束的公告（end_time > now）
+        # 只查询未结束的公告（end_time > now），且只取返回所需的列
         announcements = (
-            model.query.filter(model.end_time > now)
+            db.session.query(
+                model.id,
+                model.official_id,
+                model.title,
+                model.banner_img,
+                model.start_time,
+                model.end_time,
+                model.type,
+            )
+            .filter(model.language == lang_code)
+            .filter(model.end_time > now)
             .order_by(model.start_time.desc())
             .all()
         )
 
-        self._log(
-            f"Found {len(announcements)} active announcements in DB for {game_id} {lang}",
-            "debug",
-        )
+        if self._debug:
+            self._log(
+                f"Found {len(announcements)} active announcements in DB for {game_id} {lang}",
+                "debug",
+            )
 
-        return [
-            {
-                "id": ann.id,
-                "official_id": ann.official_id,
-                "title": ann.title,
-                "banner_img": ann.banner_img,
-                "start_time": (
-                    ann.start_time.strftime("%Y-%m-%d %H:%M:%S")
-                    if ann.start_time
-                    else None
-                ),
-                "end_time": (
-                    ann.end_time.strftime("%Y-%m-%d %H:%M:%S") if ann.end_time else None
-                ),
-                "type": ann.type,
-            }
-            for ann in announcements
-        ]
+        return [self._format_announcement(ann._mapping) for ann in announcements]
+
+    @staticmethod
+    def _format_announcement(ann) -> Dict:
+        """将公告行（列名 -> 值的映射）转换为接口返回格式"""
+        start_time = ann["start_time"]
+        end_time = ann["end_time"]
+        return {
+            "id": ann["id"],
+            "official_id": str(ann["official_id"]),
+            "title": ann["title"],
+            "banner_img": ann["banner_img"],
+            "start_time": (
+                start_time.isoformat(sep=" ", timespec="seconds")
+                if start_time
+                else None
+            ),
+            "end_time": (
+                end_time.isoformat(sep=" ", timespec="seconds") if end_time else None
+            ),
+            "type": ann["type"],
+        }
 
     def _fetch_genshin_announcements(self, lang: str) -> List[Dict]:
         """获取原神公告数据"""
@@ -425,7 +616,7 @@ class AnnouncementService:
             if not raw_data:
                 raise ValueError("No data fetched from Genshin API")
 
-            parsed_data = self._genshin_parser.parse(raw_data, lang)
+            parsed_data = GenshinParser().parse(raw_data, lang)
             return parsed_data
         except Exception as e:
             print(f"Error fetching Genshin announcements: {e}")
@@ -438,7 +629,7 @@ class AnnouncementService:
             if not raw_data:
                 raise ValueError("No data fetched from Star Rail API")
 
-            parsed_data = self._starrail_parser.parse(raw_data, lang)
+            parsed_data = StarRailParser().parse(raw_data, lang)
             return parsed_data
         except Exception as e:
             print(f"Error fetching Star Rail announcements: {e}")
@@ -451,7 +642,7 @@ class AnnouncementService:
             if not raw_data:
                 raise ValueError("No data fetched from zenless API")
 
-            parsed_data = self._zenless_parser.parse(raw_data, lang)
+            parsed_data = ZenlessParser().parse(raw_data, lang)
             return parsed_data
         except Exception as e:
             print(f"Error fetching zenless announcements: {e}")
@@ -464,7 +655,7 @@ class AnnouncementService:
             if not raw_data:
                 raise ValueError("No data fetched from Kuro API")
 
-            parsed_data = self._wuthering_parser.parse(raw_data, lang)
+            parsed_data = WutheringParser().parse(raw_data, lang)
             return parsed_data
         except Exception as e:
             print(f"Error fetching Wuthering announcements: {e}")
@@ -492,41 +683,54 @@ class AnnouncementService:
 
     def clear_cache(self, game_id: Optional[str] = None, lang: Optional[str] = None):
         """清除指定或全部缓存"""
-        if game_id and lang:
-            cache_key = f"{game_id}_{lang}"
-            self._cache.pop(cache_key, None)
-            self._log(f"Cleared cache for {cache_key}", "debug")
-        elif game_id:
-            # 清除该游戏所有语言的缓存
-            keys = [k for k in self._cache.keys() if k.startswith(f"{game_id}_")]
-            for k in keys:
-                self._cache.pop(k, None)
-            self._log(
-                f"Cleared all cache for game {game_id} ({len(keys)} entries)", "debug"
-            )
-        else:
-            self._cache.clear()
-            self._log("Cleared all cache entries", "debug")
+        with self._cache_lock:
+            if game_id and lang:
+                cache_key = f"{game_id}_{lang}"
+                self._cache.pop(cache_key, None)
+                self._log(f"Cleared cache for {cache_key}", "debug")
+            elif game_id:
+                # 清除该游戏所有语言的缓存
+                keys = [k for k in self._cache.keys() if k.startswith(f"{game_id}_")]
+                for k in keys:
+                    self._cache.pop(k, None)
+                self._log(
+                    f"Cleared all cache for game {game_id} ({len(keys)} entries)",
+                    "debug",
+                )
+            else:
+                self._cache.clear()
+                self._log("Cleared all cache entries", "debug")
 
     def _get_from_cache(self, cache_key: str) -> Optional[Any]:
         """从缓存获取数据，检查过期时间"""
-        if cache_key not in self._cache:
-            self._cache_misses += 1
-            return None
-
-        data, expiration_time = self._cache[cache_key]
-        if datetime.now() >= expiration_time:
-            self._cache.pop(cache_key, None)
-            self._cache_expirations += 1
-            self._cache_misses += 1
-            self._log(f"Cache expired for {cache_key}", "debug")
-            return None
-
-        self._cache_hits += 1
-        return data
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry is None:
+                self._cache_misses += 1
+                return None
+
+            data, expiration_time = entry
+            if time.monotonic() >= expiration_time:
+                self._cache.pop(cache_key, None)
+                self._cache_expirations += 1
+                self._cache_misses += 1
+                if self._debug:
+                    self._log(f"Cache expired for {cache_key}", "debug")
+                return None
+
+            self._cache.move_to_end(cache_key)
+            self._cache_hits += 1
+            return data
 
     def _set_to_cache(self, cache_key: str, data: Any):
         """将数据存入缓存，设置过期时间"""
-        expiration_time = datetime.now() + self._cache_ttl
-        self._cache[cache_key] = (data, expiration_time)
-        self._log(f"Data cached for {cache_key} until {expiration_time}", "debug")
+        expiration_time = time.monotonic() + self._cache_ttl
+        with self._cache_lock:
+            self._cache[cache_key] = (data, expiration_time)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > _ANNOUNCEMENT_CACHE_MAXSIZE:
+                self._cache.popitem(last=False)
+        if self._debug:
+            self._log(
+                f"Data cached for {cache_key} for {self._cache_ttl:.0f}s", "debug"
+            )
@@ -1,63 +1,124 @@
-import requests, json
+import functools
+import orjson
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
+from services.fetch.response_cache import ResponseCache, response_cache
+
+# 活动公告内容按列表项签名（id、起止时间）长期缓存，列表项不变时刷新无需重新下载内容
+activity_content_cache = ResponseCache(ttl=24 * 3600, maxsize=1024)
+
+
+@functools.lru_cache(maxsize=1)
+def load_announcement_links() -> Dict:
+    """读取并解析ann_link.json（每个进程只读取一次，读取失败时下次调用重试）"""
+    with open("data/ann_link.json", "rb") as f:
+        return orjson.loads(f.read())
 
 
 class KuroFetcher:
     """库洛游戏公告抓取器（鸣潮）"""
 
+    # 活动公告内容的语言，第一个（简体中文）用于时间解析且必须获取成功
+    CONTENT_LANGUAGES = ("zh-Hans", "zh-Hant", "en", "ja")
+    # 并发抓取公告内容的线程数
+    MAX_CONTENT_WORKERS = 16
+
     def __init__(self):
-        self.session = requests.Session()
         self._setup_session()
         self._load_announcement_links()
 
     def _load_announcement_links(self):
         """从ann_link.json加载公告链接"""
         try:
-            with open("data/ann_link.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.list_url = data.get("wuthering", {}).get("annListApi")
+            data = load_announcement_links()
+            self.list_url = data.get("wuthering", {}).get("annListApi")
         except Exception as e:
             print(f"Error loading announcement links: {e}")
 
     def _setup_session(self):
-        """配置请求会话"""
+        """配置HTTP连接池"""
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Accept-Encoding": "gzip, deflate",
             "Connection": "keep-alive",
             "Content-Type": "application/x-www-form-urlencoded",
+            # 声明本地可解码的全部压缩格式（gzip/deflate，安装Brotli后含br）
+            **make_headers(accept_encoding=True),
         }
-        self.session.headers.update(headers)
-        self.session.timeout = 10
+
+        # 热路径直接使用urllib3连接池，省去requests的会话合并和钩子开销；
+        # 连接池复用TCP/TLS连接（并发刷新时多个线程共用），并对临时错误重试
+        self.http = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=32,
+            headers=headers,
+            timeout=urllib3.Timeout(total=10),
+            retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+            ),
+        )
+
+    def _get_json(self, url: str, signature: Optional[Dict] = None) -> Dict:
+        """
+        发送GET请求并解析JSON响应，请求失败时抛出异常
+
+        未提供signature时按URL短期缓存；提供时按URL和签名长期缓存，签名变化即重新下载
+        """
+        if signature is None:
+            return response_cache.get_json(url, None, lambda: self._download(url))
+        return activity_content_cache.get_json(
+            url, signature, lambda: self._download(url)
+        )
+
+    def _download(self, url: str) -> bytes:
+        """下载响应体，请求失败时抛出urllib3.exceptions.HTTPError"""
+        response = self.http.request("GET", url)
+        if response.status >= 400:
+            raise urllib3.exceptions.HTTPError(
+                f"{response.status} Error for url: {url}"
+            )
+        return response.data
 
     def fetch_announcement_list(self) -> Optional[Dict]:
         """抓取公告总列表"""
         try:
-            response = self.session.get(self.list_url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._get_json(self.list_url)
+        except urllib3.exceptions.HTTPError as e:
             print(f"Error fetching announcement list: {e}")
             return None
-        except ValueError as e:
+        except orjson.JSONDecodeError as e:
             print(f"Error parsing announcement list: {e}")
             return None
 
-    def fetch_announcement_content(self, content_url: str) -> Optional[Dict]:
-        """抓取单个公告内容"""
+    def fetch_announcement_content(
+        self, content_url: str, signature: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """抓取单个公告内容（signature见_get_json）"""
         try:
-            response = self.session.get(content_url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._get_json(content_url, signature)
+        except urllib3.exceptions.HTTPError as e:
             print(f"Error fetching announcement content: {e}")
             return None
-        except ValueError as e:
+        except orjson.JSONDecodeError as e:
             print(f"Error parsing announcement content: {e}")
             return None
 
+    @staticmethod
+    def _activity_signature(item: Dict) -> Dict:
+        """活动列表项的签名，id或起止时间变化时视为内容已更新"""
+        return {
+            "id": item.get("id"),
+            "start": item.get("startTimeMs"),
+            "end": item.get("endTimeMs"),
+        }
+
     def fetch_zh_content(self, content_prefix: str) -> Optional[Dict]:
         """专门获取中文内容用于时间解析"""
         zh_content_url = content_prefix + "zh-Hans.json"
@@ -70,7 +131,8 @@ class KuroFetcher:
         Returns:
             {
                 "game": 游戏版本公告,
-                "activity": 活动公告列表（包含详情内容）
+                "items": 活动公告列表项（保持官方列表原样，不写入详情）,
+                "contents": {语言代码: {活动ID: 该语言的详情内容}}
             }
             或 None（如果抓取失败）
         """
@@ -78,27 +140,51 @@ class KuroFetcher:
         if not list_data:
             return None
 
-        results = {"game": list_data["game"], "activity": []}
+        # 详情内容按语言、活动ID另存，不改写列表项（列表项来自响应缓存，会被后续刷新复用）
+        results = {
+            "game": list_data["game"],
+            "items": [],
+            "contents": {lang: {} for lang in self.CONTENT_LANGUAGES},
+        }
+        contents_by_lang = results["contents"]
+
+        # 处理活动公告：所有活动的各语言内容并发抓取，共用会话连接池
+        items = [
+            item for item in list_data.get("activity", []) if item.get("contentPrefix")
+        ]
+        jobs = [
+            (index, lang, item["contentPrefix"][0] + f"{lang}.json")
+            for index, item in enumerate(items)
+            for lang in self.CONTENT_LANGUAGES
+        ]
+        signatures = [self._activity_signature(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.MAX_CONTENT_WORKERS) as executor:
+            contents = executor.map(
+                self.fetch_announcement_content,
+                [url for _, _, url in jobs],
+                [signatures[index] for index, _, _ in jobs],
+            )
+            content_map = {
+                (index, lang): content
+                for (index, lang, _), content in zip(jobs, contents)
+            }
 
-        # 处理活动公告
-        for item in list_data.get("activity", []):
-            if not item.get("contentPrefix"):
+        for index, item in enumerate(items):
+            # 中文内容用于时间解析，获取失败的活动直接跳过
+            if not content_map.get((index, "zh-Hans")):
                 continue
 
-            content_url = item["contentPrefix"][0] + "zh-Hans.json"
-            content_data = self.fetch_announcement_content(content_url)
+            for lang in self.CONTENT_LANGUAGES:
+                lang_content = content_map.get((index, lang))
+                if lang_content:
+                    contents_by_lang[lang][item["id"]] = lang_content
 
-            if content_data:
-                # 保存中文内容用于时间解析
-                item["zh_content"] = content_data
+            results["items"].append(item)
 
-                # 获取其他语言内容
-                for lang in ["zh-Hant", "en", "ja"]:
-                    lang_url = item["contentPrefix"][0] + f"{lang}.json"
-                    lang_content = self.fetch_announcement_content(lang_url)
-                    if lang_content:
-                        item[f"{lang}_content"] = lang_content
+        return results
 
-                results["activity"].append(item)
 
-        return results
+@functools.lru_cache(maxsize=1)
+def get_kuro_fetcher() -> KuroFetcher:
+    """进程内共享的抓取器实例（首次调用时创建），会话连接池在整个进程生命周期内复用"""
+    return KuroFetcher()
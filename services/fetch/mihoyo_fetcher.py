@@ -1,14 +1,27 @@
 # mihoyo_fetcher.py
-import requests
+import functools
+import logging
+import orjson
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 from typing import Dict, Optional, Tuple, List
+from services.fetch.response_cache import response_cache
 
 
 class MihoyoFetcher:
     """米哈游系游戏公告抓取器（原神、星穹铁道、绝区零）"""
 
     def __init__(self, debug=False):
-        self.session = requests.Session()
         self.debug = debug  # 调试模式开关
+        # 调试信息统一走logging，参数只在DEBUG级别启用时才格式化
+        self.log = logging.getLogger(__name__)
+        if debug:
+            self.log.setLevel(logging.DEBUG)
+            if not self.log.handlers:
+                self.log.addHandler(logging.StreamHandler())
         self._setup_session()
 
         # 游戏API配置
@@ -53,95 +66,113 @@ class MihoyoFetcher:
                 },
             },
         }
-        if self.debug:
-            print("[DEBUG] MihoyoFetcher 初始化完成，已配置以下游戏:")
-            for game in self.game_config:
-                print(f"  - {game}: {self.game_config[game]['list_url']}")
+        # 固定的查询参数预先编码，请求时只需拼接lang
+        for config in self.game_config.values():
+            config["base_query"] = urlencode(config["base_params"])
+        # 游戏集合固定不变，预先保存为元组供批量抓取时遍历
+        self._games = tuple(self.game_config)
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug("MihoyoFetcher 初始化完成，已配置以下游戏:")
+            for game, config in self.game_config.items():
+                self.log.debug("  - %s: %s", game, config["list_url"])
 
     def _setup_session(self):
-        """配置请求会话"""
+        """配置HTTP连接池"""
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Accept-Encoding": "gzip, deflate",
             "Connection": "keep-alive",
             "Content-Type": "application/x-www-form-urlencoded",
+            # 声明本地可解码的全部压缩格式（gzip/deflate，安装Brotli后含br）
+            **make_headers(accept_encoding=True),
         }
-        self.session.headers.update(headers)
-        self.session.timeout = 10
 
-        if self.debug:
-            print("[DEBUG] 会话配置完成，headers:")
-            for k, v in headers.items():
-                print(f"  {k}: {v}")
+        # 热路径直接使用urllib3连接池，省去requests的会话合并和钩子开销；
+        # 连接池复用TCP/TLS连接（并发刷新时多个线程共用），并对临时错误重试
+        self.http = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=32,
+            headers=headers,
+            timeout=urllib3.Timeout(total=10),
+            retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+            ),
+        )
+
+        self.log.debug("会话配置完成，headers: %s", headers)
+
+    def _get_json(self, url: str) -> Dict:
+        """发送GET请求并解析JSON响应（短期缓存相同请求的响应），请求失败时抛出异常"""
+        return response_cache.get_json(url, None, lambda: self._download_api(url))
+
+    def _download_api(self, url: str) -> bytes:
+        """下载接口响应体，retcode不为0时抛出ValueError，避免错误响应被缓存"""
+        content = self._download(url)
+        retcode = orjson.loads(content).get("retcode")
+        if retcode != 0:
+            raise ValueError(f"接口返回错误 retcode={retcode}: {url}")
+        return content
+
+    def _download(self, url: str) -> bytes:
+        """下载响应体，请求失败时抛出urllib3.exceptions.HTTPError"""
+        resp = self.http.request("GET", url)
+        if resp.status >= 400:
+            raise urllib3.exceptions.HTTPError(f"{resp.status} Error for url: {url}")
+        return resp.data
 
     def _fetch_announcement_data(
         self, game: str, lang: str
     ) -> Tuple[Optional[Dict], Optional[Dict]]:
         """获取指定语言的公告数据"""
         if game not in self.game_config:
-            if self.debug:
-                print(f"[DEBUG] 无效的游戏标识: {game}")
+            self.log.debug("无效的游戏标识: %s", game)
             return None, None
 
         config = self.game_config[game]
-        params = {**config["base_params"], "lang": lang}
+        query = f"?{config['base_query']}&lang={lang}"
+        list_url = config["list_url"] + query
+        content_url = config["content_url"] + query
 
-        if self.debug:
-            print(f"[DEBUG] 开始获取 {game} {lang} 公告数据")
-            print(f"[DEBUG] 请求参数: {params}")
+        self.log.debug("开始获取 %s %s 公告数据", game, lang)
 
         try:
-            # 获取列表数据
-            if self.debug:
-                print(
-                    f"[DEBUG] 正在请求列表数据: {config['list_url']}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
-                )
-            list_resp = self.session.get(config["list_url"], params=params)
-            list_resp.raise_for_status()
-            list_data = list_resp.json()
-
-            if self.debug:
-                print(f"[DEBUG] 列表数据获取成功，状态码: {list_resp.status_code}")
-                print(f"[DEBUG] 返回的公告数量: {len(list_data['data']['list'])}")
-
-            # 获取内容数据
-            if self.debug:
-                print(
-                    f"[DEBUG] 正在请求内容数据: {config['content_url']}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
-                )
-            content_resp = self.session.get(config["content_url"], params=params)
-            content_resp.raise_for_status()
-            content_data = content_resp.json()
+            self.log.debug("正在请求列表数据: %s", list_url)
+            self.log.debug("正在请求内容数据: %s", content_url)
 
-            if self.debug:
-                print(f"[DEBUG] 内容数据获取成功，状态码: {content_resp.status_code}")
-                print(f"[DEBUG] 返回的内容数量: {len(content_data['data']['list'])}")
+            # 列表和内容两个请求相互独立，并发获取
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list_future = executor.submit(self._get_json, list_url)
+                content_future = executor.submit(self._get_json, content_url)
+                list_data = list_future.result()
+                content_data = content_future.result()
 
             # 构建内容映射
-            content_map = {
-                item["ann_id"]: item for item in content_data["data"]["list"]
-            }
-            pic_content_map = {
-                item["ann_id"]: item for item in content_data["data"]["pic_list"]
-            }
-
-            if self.debug:
-                print(f"[DEBUG] 构建完成的内容映射: {len(content_map)} 条")
-                print(f"[DEBUG] 构建完成的图片内容映射: {len(pic_content_map)} 条")
+            contents = content_data["data"]
+            content_map = {item["ann_id"]: item for item in contents["list"]}
+            pic_content_map = {item["ann_id"]: item for item in contents["pic_list"]}
+
+            if self.log.isEnabledFor(logging.DEBUG):
+                self.log.debug(
+                    "返回的公告数量: %d，内容数量: %d；构建完成的内容映射: %d 条，图片内容映射: %d 条",
+                    len(list_data["data"]["list"]),
+                    len(contents["list"]),
+                    len(content_map),
+                    len(pic_content_map),
+                )
 
             return list_data, {
                 "content_map": content_map,
                 "pic_content_map": pic_content_map,
             }
-        except requests.exceptions.RequestException as e:
-            if self.debug:
-                print(f"[DEBUG] 请求失败: {type(e).__name__}: {e}")
+        except urllib3.exceptions.HTTPError as e:
+            self.log.debug("请求失败: %s: %s", type(e).__name__, e)
             return None, None
         except Exception as e:
-            if self.debug:
-                print(f"[DEBUG] 处理数据时发生错误: {type(e).__name__}: {e}")
+            self.log.debug("处理数据时发生错误: %s: %s", type(e).__name__, e)
             return None, None
 
     def fetch_game_announcements(self, game: str, lang: str) -> Optional[Dict]:
@@ -166,32 +197,35 @@ class MihoyoFetcher:
         """
         lang_mapper = {"zh-Hans": "zh-cn", "zh-Hant": "zh-tw"}
         lang = lang_mapper.get(lang, lang)
-        if self.debug:
-            print(f"[DEBUG] 开始抓取 {game} 游戏的 {lang} 公告数据")
-
-        # 1. 获取请求语言的列表和内容数据
-        if self.debug:
-            print(f"[DEBUG] 第一步: 获取 {lang} 语言的数据")
-        lang_list_data, lang_content_data = self._fetch_announcement_data(game, lang)
+        self.log.debug("开始抓取 %s 游戏的 %s 公告数据", game, lang)
+
+        # 1. 获取请求语言的列表和内容数据（非中文时同时并发获取中文数据）
+        self.log.debug("第一步: 获取 %s 语言的数据", lang)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            zh_future = (
+                executor.submit(self._fetch_announcement_data, game, "zh-cn")
+                if lang != "zh-cn"
+                else None
+            )
+            lang_list_data, lang_content_data = self._fetch_announcement_data(
+                game, lang
+            )
+            zh_result = zh_future.result() if zh_future else None
         if not lang_list_data or not lang_content_data:
-            if self.debug:
-                print(f"[DEBUG] 获取 {lang} 语言数据失败，终止处理")
+            self.log.debug("获取 %s 语言数据失败，终止处理", lang)
             return None
 
         # 2. 获取中文数据
         if lang == "zh-cn":
-            if self.debug:
-                print("[DEBUG] 请求语言为中文，无需额外获取中文数据")
+            self.log.debug("请求语言为中文，无需额外获取中文数据")
             zh_list_data = lang_list_data
             zh_content_map = lang_content_data["content_map"]
             zh_pic_content_map = lang_content_data["pic_content_map"]
         else:
-            if self.debug:
-                print("[DEBUG] 第二步: 获取中文数据")
-            zh_list_data, zh_content_data = self._fetch_announcement_data(game, "zh-cn")
+            self.log.debug("第二步: 获取中文数据")
+            zh_list_data, zh_content_data = zh_result
             if not zh_content_data:
-                if self.debug:
-                    print("[DEBUG] 获取中文内容失败，但仍返回已获取的数据")
+                self.log.debug("获取中文内容失败，但仍返回已获取的数据")
                 zh_content_map = {}
                 zh_pic_content_map = {}
             else:
@@ -199,8 +233,7 @@ class MihoyoFetcher:
                 zh_pic_content_map = zh_content_data["pic_content_map"]
 
             if not zh_list_data:
-                if self.debug:
-                    print("[DEBUG] 获取中文列表失败，但仍返回已获取的数据")
+                self.log.debug("获取中文列表失败，但仍返回已获取的数据")
                 zh_list_data = None
 
         result = {
@@ -213,44 +246,56 @@ class MihoyoFetcher:
             "lang": lang,
         }
 
-        if self.debug:
-            print(f"[DEBUG] 数据抓取完成，返回结果包含:")
-            print(f"  - {lang}列表数据: {len(lang_list_data['data']['list'])} 条")
-            print(f"  - {lang}内容映射: {len(lang_content_data['content_map'])} 条")
-            print(
-                f"  - {lang}图片内容映射: {len(lang_content_data['pic_content_map'])} 条"
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                "数据抓取完成: %s列表 %d 条，内容映射 %d 条，图片内容映射 %d 条；"
+                "中文列表 %s 条，内容映射 %d 条，图片内容映射 %d 条",
+                lang,
+                len(lang_list_data["data"]["list"]),
+                len(lang_content_data["content_map"]),
+                len(lang_content_data["pic_content_map"]),
+                len(zh_list_data["data"]["list"]) if zh_list_data else "无",
+                len(zh_content_map),
+                len(zh_pic_content_map),
             )
-            if zh_list_data:
-                print(f"  - 中文列表数据: {len(zh_list_data['data']['list'])} 条")
-            else:
-                print("  - 中文列表数据: 无")
-            print(f"  - 中文内容映射: {len(zh_content_map)} 条")
-            print(f"  - 中文图片内容映射: {len(zh_pic_content_map)} 条")
 
         return result
 
     def fetch_all_mihoyo_games(self, lang: str = "en") -> Dict[str, Optional[Dict]]:
         """抓取所有米哈游游戏的公告数据"""
-        if self.debug:
-            print(f"[DEBUG] 开始抓取所有米哈游游戏公告，语言: {lang}")
-
-        results = {}
-        for game in self.game_config.keys():
-            if self.debug:
-                print(f"[DEBUG] 正在处理游戏: {game}")
-            results[game] = self.fetch_game_announcements(game, lang)
+        self.log.debug("开始抓取所有米哈游游戏公告，语言: %s", lang)
+
+        # 各游戏相互独立，并发抓取
+        with ThreadPoolExecutor(max_workers=len(self._games)) as executor:
+            results = dict(
+                zip(
+                    self._games,
+                    executor.map(
+                        lambda game: self.fetch_game_announcements(game, lang),
+                        self._games,
+                    ),
+                )
+            )
 
-        if self.debug:
-            print("[DEBUG] 所有游戏处理完成")
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug("所有游戏处理完成")
             for game, data in results.items():
                 if data:
-                    print(f"  {game}: 成功获取 {len(data['content_map'])} 条公告")
+                    self.log.debug(
+                        "  %s: 成功获取 %d 条公告", game, len(data["content_map"])
+                    )
                 else:
-                    print(f"  {game}: 获取失败")
+                    self.log.debug("  %s: 获取失败", game)
 
         return results
 
 
+@functools.lru_cache(maxsize=1)
+def get_mihoyo_fetcher() -> MihoyoFetcher:
+    """进程内共享的抓取器实例（首次调用时创建），会话连接池在整个进程生命周期内复用"""
+    return MihoyoFetcher()
+
+
 # 使用示例
 if __name__ == "__main__":
     fetcher = MihoyoFetcher(debug=True)
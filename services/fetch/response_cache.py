@@ -0,0 +1,96 @@
+"""抓取器共用的HTTP响应缓存（进程内，按URL和请求参数缓存响应体）"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+
+# 官方公告接口更新频率较低，同一刷新周期内重复的请求（如各语言都需要的中文数据）直接复用
+DEFAULT_TTL = 300  # 秒
+DEFAULT_MAXSIZE = 512
+
+
+class ResponseCache:
+    """线程安全的TTL + LRU响应缓存，缓存原始响应体而不是解析结果，避免调用方修改共享对象"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, maxsize: int = DEFAULT_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # {key: (content, 过期时刻 time.monotonic())}
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 正在下载中的请求 {key: lock}，相同请求并发未命中时只下载一次
+        self._loading: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def _make_key(url: str, params: Optional[Dict]) -> str:
+        if not params:
+            return url
+        return url + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+    def get(self, url: str, params: Optional[Dict] = None) -> Optional[bytes]:
+        """返回未过期的响应体，不存在或已过期时返回None"""
+        if self.ttl <= 0:
+            return None
+        key = self._make_key(url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            content, expiration_time = entry
+            if time.monotonic() >= expiration_time:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return content
+
+    def set(self, url: str, params: Optional[Dict], content: bytes):
+        """缓存响应体，超过上限时淘汰最久未使用的条目"""
+        if self.ttl <= 0:
+            return
+        key = self._make_key(url, params)
+        with self._lock:
+            self._entries[key] = (content, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_json(
+        self, url: str, params: Optional[Dict], download: Callable[[], bytes]
+    ) -> Any:
+        """
+        返回解析后的JSON，未命中时调用download()获取响应体
+
+        同一请求被多个线程同时请求时（如并发刷新的各语言都需要同一份中文数据），
+        只有一个线程真正下载，其余线程等待后直接读取缓存。响应体解析成功后才写入缓存。
+        """
+        content = self.get(url, params)
+        if content is not None:
+            return orjson.loads(content)
+
+        key = self._make_key(url, params)
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                content = self.get(url, params)
+                if content is not None:
+                    return orjson.loads(content)
+                content = download()
+                data = orjson.loads(content)
+                self.set(url, params, content)
+                return data
+        finally:
+            with self._lock:
+                if self._loading.get(key) is key_lock:
+                    del self._loading[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 所有抓取器共用的缓存实例
+response_cache = ResponseCache()
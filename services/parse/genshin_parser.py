@@ -1,9 +1,45 @@
 import re
 import json
+import functools
+import time
+import orjson
 from datetime import datetime
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import Dict, List, Optional, Tuple, Union
 
+# 提取时间和角色名只需要以下标签（时间标记、时间段和角色段落都在其中），其余节点不构建，减少建树开销
+EVENT_STRAINER = SoupStrainer(["p", "td", "t", "span"])
+
+# 预编译的正则表达式
+_RE_HTML_TAG = re.compile(r"<.*?>")
+_RE_VERSION = re.compile(r"(\d+\.\d+)")
+_RE_WEAPON_NAME = re.compile(r"「[^」]*·([^」]*)」")
+_RE_GACHA_NAME = re.compile(r"「([^」]+)」祈愿")
+_RE_CHAR_NAME = re.compile(r"·(.*?)\(")
+_RE_SLASH_TIME = re.compile(r"\d{4}/\d{2}/\d{2} \d{2}:\d{2}")
+# 常规祈愿的时间单元格，按解析树的查找顺序（rowspan为3、5、9）排列
+_RE_GACHA_TIME_CELLS = tuple(
+    re.compile(
+        rf"""<td\b[^>]*\browspan=["']?{rowspan}(?=["'\s/>])[^>]*>(.*?)</td>""", re.S
+    )
+    for rowspan in ("3", "5", "9")
+)
+_GACHA_TIME_CHILD_TAGS = ("<p", "<t>", "<t ")
+_RE_NON_TIME_CHARS = re.compile(r"[^\d/ :]")
+# 标准时间字符串 "2023-11-15 10:00:00"，形状与strptime的"%Y-%m-%d %H:%M:%S"完全一致
+_RE_ISO_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", re.ASCII)
+_RE_SLASH_TIME_PARTS = re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2})\s+(\d{1,2}):(\d{1,2})")
+
+# 中文日期中的年月日替换为分隔符（一次translate完成）
+_CN_DATE_TRANS_DASH = str.maketrans({"年": "-", "月": "-", "日": ""})
+_CN_DATE_TRANS_SLASH = str.maketrans({"年": "/", "月": "/", "日": ""})
+
+# 写入content的公告字段，其余字段（content_type、extra_remind等）不会被使用
+_CONTENT_KEEP = ("title", "subtitle", "banner", "content", "lang")
+
+# 活动公告中时间段前的标记，按优先级排列
+_TIME_MARKERS = ("〓获取奖励时限〓", "〓活动时间〓")
+
 
 class GenshinParser:
     """原神(Genshin Impact)公告解析器（优化版）"""
@@ -13,6 +49,9 @@ class GenshinParser:
         self.version_begin_time = ""
         self.supported_languages = ["zh-cn", "zh-tw", "en", "ja", "ko"]
         self.debug = debug  # 调试模式开关
+        self._soup_cache = {}  # 单次parse内按ann_id缓存的中文内容解析树
+        self._full_soup_cache = {}  # 单次parse内按HTML缓存的不限标签的完整解析树
+        self._target_index = {}  # 单次parse内目标语言公告按ann_id建立的索引
 
     def _debug_print(self, *args, **kwargs):
         """调试输出"""
@@ -51,311 +90,334 @@ class GenshinParser:
         """
         lang_mapper = {"zh-Hans": "zh-cn", "zh-Hant": "zh-tw"}
         lang = lang_mapper.get(lang, lang)
-        self._debug_print(f"开始解析原神公告数据，语言: {lang}")
-        self._debug_print(f"原始数据键: {raw_data.keys()}")
+        if self.debug:
+            self._debug_print(f"开始解析原神公告数据，语言: {lang}")
+            self._debug_print(f"原始数据键: {raw_data.keys()}")
 
         if lang not in self.supported_languages:
             lang = "zh-cn"
-            self._debug_print(f"不支持的语言，已重置为默认语言: {lang}")
+            if self.debug:
+                self._debug_print(f"不支持的语言，已重置为默认语言: {lang}")
 
         filtered_list = []
 
-        # 1. 处理版本公告
-        self._debug_print("\n=== 开始解析版本公告 ===")
-        self._parse_version_announcements(raw_data, filtered_list, lang)
-
-        # 2. 处理活动公告
-        self._debug_print("\n=== 开始解析活动公告 ===")
-        self._parse_event_announcements(raw_data, filtered_list, lang)
+        # 目标语言公告按ann_id建立索引，查找时无需逐个遍历
+        if lang != "zh-cn":
+            self._target_index = self._build_target_index(raw_data)
 
-        # 3. 处理祈愿(抽卡)公告
-        self._debug_print("\n=== 开始解析祈愿公告 ===")
-        self._parse_gacha_announcements(raw_data, filtered_list, lang)
+        # 一次遍历公告列表，依次得到版本、活动、祈愿(抽卡)公告
+        self._parse_announcement_lists(raw_data, filtered_list, lang)
 
-        self._debug_print(f"\n解析完成，共找到 {len(filtered_list)} 条公告")
+        if self.debug:
+            self._debug_print(f"\n解析完成，共找到 {len(filtered_list)} 条公告")
+        self._soup_cache.clear()
+        self._full_soup_cache.clear()
+        self._target_index = {}
         return filtered_list
 
-    def _parse_version_announcements(
-        self, raw_data: Dict, result_list: List[Dict], lang: str
-    ):
-        """解析版本更新公告"""
-        # 使用中文列表数据进行解析
-        zh_list_data = raw_data.get("zh_list", raw_data["list"])
-        if "data" not in zh_list_data:
-            self._debug_print("警告: 缺少data字段，无法解析版本公告")
-            return
+    @staticmethod
+    def _build_target_index(raw_data: Dict) -> Dict:
+        """将目标语言公告列表按ann_id建立索引（同一ID保留首次出现的公告）"""
+        if "list" not in raw_data or "data" not in raw_data["list"]:
+            return {}
 
-        version_list = zh_list_data["data"]["list"]
-        self._debug_print(f"找到 {len(version_list)} 个公告类别")
-
-        for item in version_list:
-            self._debug_print(f"\n处理公告类别: {item['type_label']}")
-            if item["type_label"] == "游戏公告":
-                self._debug_print(f"找到游戏公告类别，包含 {len(item['list'])} 条公告")
-
-                for announcement in item["list"]:
-                    ann_id = announcement["ann_id"]
-                    self._debug_print(f"处理公告 ID: {ann_id}")
-
-                    # 使用中文标题提取版本号
-                    zh_title = self._get_zh_title(announcement, raw_data)
-                    clean_zh_title = self._remove_html_tags(zh_title)
-                    self._debug_print(f"中文标题: {clean_zh_title}")
-
-                    if "版本更新说明" in clean_zh_title:
-                        self._debug_print("检测到版本更新公告")
-
-                        # 提取版本号
-                        version_numbers = self._extract_version_number(clean_zh_title)
-                        if version_numbers:
-                            self.version_now = str(version_numbers[0])
-                            self._debug_print(f"提取到版本号: {self.version_now}")
-                        else:
-                            self._debug_print("警告: 无法从标题中提取版本号")
-
-                        # 获取目标语言的公告数据
-                        target_announcement = self._get_target_lang_announcement(
-                            announcement, raw_data, lang
-                        )
-                        if not target_announcement:
-                            self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
-                            continue
-
-                        # 获取目标语言的标题
-                        title = self._remove_html_tags(target_announcement["title"])
-                        self._debug_print(f"目标语言标题: {title}")
-
-                        # 获取横幅图片（优先使用目标语言的图片）
-                        banner_image = target_announcement.get(
-                            "banner", announcement.get("banner", "")
-                        )
-                        self._debug_print(f"横幅图片: {banner_image[:50]}...")
-
-                        # 获取时间
-                        start_time = self._timestamp_to_datetime(
-                            announcement.get("start_time", "")
-                        )
-                        end_time = self._timestamp_to_datetime(
-                            announcement.get("end_time", "")
-                        )
-                        self._debug_print(f"时间范围: {start_time} 至 {end_time}")
-
-                        parsed = {
-                            "ann_id": ann_id,
-                            "title": (
-                                f"{self.version_now}" if lang == "zh-cn" else title
-                            ),
-                            "start_time": start_time,
-                            "end_time": end_time,
-                            "bannerImage": banner_image,
-                            "event_type": "version",
-                            "content": json.dumps(
-                                target_announcement, ensure_ascii=False
-                            ),
-                            "lang": lang,
-                        }
-
-                        self.version_begin_time = start_time
-                        result_list.append(parsed)
-                        self._debug_print("已添加到结果列表")
-                        break
+        index = {}
+        for item in raw_data["list"]["data"]["list"]:
+            for announcement in item["list"]:
+                index.setdefault(announcement["ann_id"], announcement)
+        return index
+
+    def _build_soup(self, ann_id: int, html_content: str) -> Optional[BeautifulSoup]:
+        """解析公告的中文HTML内容，同一公告在单次parse内只解析一次"""
+        if not html_content:
+            return None
+        soup = self._soup_cache.get(ann_id)
+        if soup is None:
+            soup = BeautifulSoup(html_content, "lxml", parse_only=EVENT_STRAINER)
+            self._soup_cache[ann_id] = soup
+        return soup
 
-    def _parse_event_announcements(
+    def _parse_announcement_lists(
         self, raw_data: Dict, result_list: List[Dict], lang: str
     ):
-        """解析活动公告"""
+        """一次遍历中文列表数据，解析版本、活动和祈愿公告"""
         # 使用中文列表数据进行解析
         zh_list_data = raw_data.get("zh_list", raw_data["list"])
         if "data" not in zh_list_data:
-            self._debug_print("警告: 缺少data字段，无法解析活动公告")
+            self._debug_print("警告: 缺少data字段，无法解析公告")
             return
 
-        event_list = zh_list_data["data"]["list"]
-        self._debug_print(f"找到 {len(event_list)} 个公告类别")
+        category_list = zh_list_data["data"]["list"]
+        if self.debug:
+            self._debug_print(f"找到 {len(category_list)} 个公告类别")
 
-        for item in event_list:
-            if item["type_label"] == "活动公告":
+        # 1. 处理版本公告；活动公告类别先收集，待版本号和版本开始时间确定后再解析
+        self._debug_print("\n=== 开始解析版本公告 ===")
+        activity_categories = []
+        for item in category_list:
+            type_label = item["type_label"]
+            if self.debug:
+                self._debug_print(f"\n处理公告类别: {type_label}")
+            if type_label == "活动公告":
+                activity_categories.append(item)
+            elif type_label == "游戏公告":
+                self._parse_version_category(item, raw_data, result_list, lang)
+
+        # 2. 处理活动公告和祈愿(抽卡)公告：每条公告只遍历一次，按原顺序先输出活动再输出祈愿
+        self._debug_print("\n=== 开始解析活动公告和祈愿公告 ===")
+        event_results = []
+        gacha_results = []
+        # 循环内反复用到的属性和方法先取到局部变量
+        debug = self.debug
+        get_zh_content = raw_data["zh_content_map"].get
+        remove_tags = self._remove_html_tags
+        is_valid_event = self._is_valid_event
+        for item in activity_categories:
+            if debug:
                 self._debug_print(f"找到活动公告类别，包含 {len(item['list'])} 条公告")
 
-                for announcement in item["list"]:
-                    ann_id = announcement["ann_id"]
+            for announcement in item["list"]:
+                ann_id = announcement["ann_id"]
+                if debug:
                     self._debug_print(f"\n处理公告 ID: {ann_id}")
 
-                    # 获取中文内容
-                    # print(
-                    #     list(raw_data["zh_content_map"].keys())[2],
-                    #     type(list(raw_data["zh_content_map"].keys())[2]),
-                    #     type(ann_id),
-                    # )
-                    zh_content = raw_data["zh_content_map"].get(ann_id, {})
-                    if not zh_content:
+                # 获取中文内容
+                zh_content = get_zh_content(ann_id, {})
+                if not zh_content:
+                    if debug:
                         self._debug_print(f"警告: 公告 {ann_id} 无中文内容数据")
-                        continue
+                    continue
 
-                    # 使用中文标题判断是否为有效活动
-                    zh_title = self._remove_html_tags(
-                        zh_content.get("title", announcement["title"])
-                    )
+                # 使用中文标题判断公告类型
+                zh_title = remove_tags(zh_content.get("title", announcement["title"]))
+                if debug:
                     self._debug_print(f"中文标题: {zh_title}")
 
-                    if not self._is_valid_event(zh_title):
-                        self._debug_print("非有效活动公告，跳过")
-                        continue
-
-                    # 获取目标语言的公告数据
-                    target_announcement = self._get_target_lang_announcement(
-                        announcement, raw_data, lang
+                if is_valid_event(zh_title):
+                    parsed = self._parse_event_announcement(
+                        announcement, zh_content, raw_data, lang
                     )
-                    if not target_announcement:
+                    if parsed:
+                        event_results.append(parsed)
+                else:
+                    self._debug_print("非有效活动公告")
+
+                if announcement.get("tag_label") == "扭蛋" or "祈愿" in zh_title:
+                    parsed = self._parse_gacha_announcement(
+                        announcement, zh_content, zh_title, raw_data, lang
+                    )
+                    if parsed:
+                        gacha_results.append(parsed)
+                else:
+                    self._debug_print("非祈愿公告")
+
+        result_list.extend(event_results)
+        result_list.extend(gacha_results)
+
+    def _parse_version_category(
+        self, item: Dict, raw_data: Dict, result_list: List[Dict], lang: str
+    ):
+        """解析游戏公告类别中的版本更新公告"""
+        if self.debug:
+            self._debug_print(f"找到游戏公告类别，包含 {len(item['list'])} 条公告")
+
+        for announcement in item["list"]:
+            ann_id = announcement["ann_id"]
+            if self.debug:
+                self._debug_print(f"处理公告 ID: {ann_id}")
+
+            # 使用中文标题提取版本号
+            zh_title = self._get_zh_title(announcement, raw_data)
+            clean_zh_title = self._remove_html_tags(zh_title)
+            if self.debug:
+                self._debug_print(f"中文标题: {clean_zh_title}")
+
+            if "版本更新说明" in clean_zh_title:
+                self._debug_print("检测到版本更新公告")
+
+                # 提取版本号
+                version_numbers = self._extract_version_number(clean_zh_title)
+                if version_numbers:
+                    self.version_now = str(version_numbers[0])
+                    if self.debug:
+                        self._debug_print(f"提取到版本号: {self.version_now}")
+                else:
+                    self._debug_print("警告: 无法从标题中提取版本号")
+
+                # 获取目标语言的公告数据
+                target_announcement = self._get_target_lang_announcement(
+                    announcement, raw_data, lang
+                )
+                if not target_announcement:
+                    if self.debug:
                         self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
-                        continue
+                    continue
 
-                    # 获取目标语言的标题
-                    title = self._remove_html_tags(target_announcement["title"])
+                # 获取目标语言的标题
+                title = self._remove_html_tags(target_announcement["title"])
+                if self.debug:
                     self._debug_print(f"目标语言标题: {title}")
 
-                    # 获取横幅图片（优先使用目标语言的图片）
-                    banner_image = target_announcement.get(
-                        "banner", announcement.get("banner", "")
-                    )
+                # 获取横幅图片（优先使用目标语言的图片）
+                banner_image = target_announcement.get(
+                    "banner", announcement.get("banner", "")
+                )
+                if self.debug:
                     self._debug_print(f"横幅图片: {banner_image[:50]}...")
 
-                    # 获取时间（从中文内容中提取）
-                    start_time, end_time = self._get_time_from_zh_content(
-                        announcement, zh_content
-                    )
-                    self._debug_print(
-                        f"从中文内容提取的时间: {start_time} 至 {end_time}"
-                    )
-
-                    if not start_time:
-                        start_time = self._timestamp_to_datetime(
-                            announcement.get("start_time", "")
-                        )
-                        self._debug_print(f"使用公告时间作为开始时间: {start_time}")
-                    if not end_time:
-                        end_time = self._timestamp_to_datetime(
-                            announcement.get("end_time", "")
-                        )
-                        self._debug_print(f"使用公告时间作为结束时间: {end_time}")
-
-                    parsed = {
-                        "ann_id": ann_id,
-                        "title": title,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "bannerImage": banner_image,
-                        "event_type": "event",
-                        "content": json.dumps(
-                            raw_data["content_map"].get(ann_id, {}), ensure_ascii=False
-                        ),
-                        "lang": lang,
-                    }
-
-                    result_list.append(parsed)
-                    self._debug_print("已添加到结果列表")
-
-    def _parse_gacha_announcements(
-        self, raw_data: Dict, result_list: List[Dict], lang: str
-    ):
-        """解析祈愿(抽卡)公告"""
-        # 使用中文列表数据进行解析
-        zh_list_data = raw_data.get("zh_list", raw_data["list"])
-        if "data" not in zh_list_data:
-            self._debug_print("警告: 缺少data字段，无法解析祈愿公告")
-            return
+                # 获取时间
+                start_time = self._timestamp_to_datetime(
+                    announcement.get("start_time", "")
+                )
+                end_time = self._timestamp_to_datetime(announcement.get("end_time", ""))
+                if self.debug:
+                    self._debug_print(f"时间范围: {start_time} 至 {end_time}")
+
+                parsed = {
+                    "ann_id": ann_id,
+                    "title": (f"{self.version_now}" if lang == "zh-cn" else title),
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "bannerImage": banner_image,
+                    "event_type": "version",
+                    "content": self._dump_content(target_announcement),
+                    "lang": lang,
+                }
 
-        gacha_list = zh_list_data["data"]["list"]
-        self._debug_print(f"找到 {len(gacha_list)} 个公告类别")
+                self.version_begin_time = start_time
+                result_list.append(parsed)
+                self._debug_print("已添加到结果列表")
+                break
 
-        for item in gacha_list:
-            if item["type_label"] == "活动公告":
-                self._debug_print(f"找到活动公告类别，包含 {len(item['list'])} 条公告")
+    def _parse_event_announcement(
+        self, announcement: Dict, zh_content: Dict, raw_data: Dict, lang: str
+    ) -> Optional[Dict]:
+        """解析单条活动公告，找不到目标语言数据时返回None"""
+        ann_id = announcement["ann_id"]
 
-                for announcement in item["list"]:
-                    ann_id = announcement["ann_id"]
-                    self._debug_print(f"\n处理公告 ID: {ann_id}")
+        # 获取目标语言的公告数据
+        target_announcement = self._get_target_lang_announcement(
+            announcement, raw_data, lang
+        )
+        if not target_announcement:
+            if self.debug:
+                self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
+            return None
 
-                    # 获取中文内容
-                    zh_content = raw_data["zh_content_map"].get(ann_id, {})
-                    if not zh_content:
-                        self._debug_print(f"警告: 公告 {ann_id} 无中文内容数据")
-                        continue
+        # 获取目标语言的标题
+        title = self._remove_html_tags(target_announcement["title"])
+        if self.debug:
+            self._debug_print(f"目标语言标题: {title}")
 
-                    # 使用中文标题判断是否为祈愿公告
-                    zh_title = self._remove_html_tags(
-                        zh_content.get("title", announcement["title"])
-                    )
-                    self._debug_print(f"中文标题: {zh_title}")
+        # 获取横幅图片（优先使用目标语言的图片）
+        banner_image = target_announcement.get("banner", announcement.get("banner", ""))
+        if self.debug:
+            self._debug_print(f"横幅图片: {banner_image[:50]}...")
 
-                    if (
-                        announcement.get("tag_label") != "扭蛋"
-                        and "祈愿" not in zh_title
-                    ):
-                        self._debug_print("非祈愿公告，跳过")
-                        continue
+        # 获取时间（从中文内容中提取）
+        soup = self._build_soup(ann_id, zh_content.get("content", ""))
+        start_time, end_time = self._get_time_from_zh_content(
+            announcement, zh_content, soup
+        )
+        if self.debug:
+            self._debug_print(f"从中文内容提取的时间: {start_time} 至 {end_time}")
+
+        if not start_time:
+            start_time = self._timestamp_to_datetime(announcement.get("start_time", ""))
+            if self.debug:
+                self._debug_print(f"使用公告时间作为开始时间: {start_time}")
+        if not end_time:
+            end_time = self._timestamp_to_datetime(announcement.get("end_time", ""))
+            if self.debug:
+                self._debug_print(f"使用公告时间作为结束时间: {end_time}")
+
+        self._debug_print("已添加到活动公告结果")
+        return {
+            "ann_id": ann_id,
+            "title": title,
+            "start_time": start_time,
+            "end_time": end_time,
+            "bannerImage": banner_image,
+            "event_type": "event",
+            "content": self._dump_content(raw_data["content_map"].get(ann_id, {})),
+            "lang": lang,
+        }
+
+    def _parse_gacha_announcement(
+        self,
+        announcement: Dict,
+        zh_content: Dict,
+        zh_title: str,
+        raw_data: Dict,
+        lang: str,
+    ) -> Optional[Dict]:
+        """解析单条祈愿(抽卡)公告，找不到目标语言数据时返回None"""
+        ann_id = announcement["ann_id"]
 
-                    # 获取目标语言的公告数据
-                    target_announcement = self._get_target_lang_announcement(
-                        announcement, raw_data, lang
-                    )
-                    if not target_announcement:
-                        self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
-                        continue
+        # 获取目标语言的公告数据
+        target_announcement = self._get_target_lang_announcement(
+            announcement, raw_data, lang
+        )
+        if not target_announcement:
+            if self.debug:
+                self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
+            return None
 
-                    # 获取目标语言的标题
-                    title = self._remove_html_tags(target_announcement["title"])
-                    self._debug_print(f"目标语言标题: {title}")
+        # 获取目标语言的标题
+        title = self._remove_html_tags(target_announcement["title"])
+        if self.debug:
+            self._debug_print(f"目标语言标题: {title}")
 
-                    # 如果是中文，使用专门解析的标题
-                    if lang in ["zh-cn"]:
-                        title = self._parse_gacha_content(zh_title, zh_content)
-                        self._debug_print(f"中文祈愿公告，使用解析后的标题: {title}")
-                    else:
-                        self._debug_print(f"非中文祈愿公告，保持原标题: {title}")
+        # 解析树只在生成中文标题时必需；提取时间时按需构建
+        soup = (
+            self._build_soup(ann_id, zh_content.get("content", ""))
+            if lang == "zh-cn"
+            else None
+        )
 
-                    # 获取横幅图片（优先使用目标语言的图片）
-                    banner_image = target_announcement.get(
-                        "banner", announcement.get("banner", "")
-                    )
-                    if not banner_image and "banner" in zh_content:
-                        banner_image = zh_content["banner"]
-                    self._debug_print(f"横幅图片: {banner_image[:50]}...")
+        # 如果是中文，使用专门解析的标题
+        if lang in ["zh-cn"]:
+            title = self._parse_gacha_content(zh_title, zh_content, soup)
+            if self.debug:
+                self._debug_print(f"中文祈愿公告，使用解析后的标题: {title}")
+        else:
+            if self.debug:
+                self._debug_print(f"非中文祈愿公告，保持原标题: {title}")
 
-                    # 获取时间（从中文内容中提取）
-                    start_time, end_time = self._get_time_from_zh_content(
-                        announcement, zh_content
-                    )
-                    self._debug_print(
-                        f"从中文内容提取的时间: {start_time} 至 {end_time}"
-                    )
+        # 获取横幅图片（优先使用目标语言的图片）
+        banner_image = target_announcement.get("banner", announcement.get("banner", ""))
+        if not banner_image and "banner" in zh_content:
+            banner_image = zh_content["banner"]
+        if self.debug:
+            self._debug_print(f"横幅图片: {banner_image[:50]}...")
 
-                    if not start_time:
-                        start_time = self._timestamp_to_datetime(
-                            announcement.get("start_time", "")
-                        )
-                        self._debug_print(f"使用公告时间作为开始时间: {start_time}")
-                    if not end_time:
-                        end_time = self._timestamp_to_datetime(
-                            announcement.get("end_time", "")
-                        )
-                        self._debug_print(f"使用公告时间作为结束时间: {end_time}")
-
-                    parsed = {
-                        "ann_id": ann_id,
-                        "title": title,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "bannerImage": banner_image,
-                        "event_type": "gacha",
-                        "content": json.dumps(
-                            raw_data["content_map"].get(ann_id, {}), ensure_ascii=False
-                        ),
-                        "lang": lang,
-                    }
-
-                    result_list.append(parsed)
-                    self._debug_print("已添加到结果列表")
+        # 获取时间（从中文内容中提取）
+        start_time, end_time = self._get_time_from_zh_content(
+            announcement, zh_content, soup
+        )
+        if self.debug:
+            self._debug_print(f"从中文内容提取的时间: {start_time} 至 {end_time}")
+
+        if not start_time:
+            start_time = self._timestamp_to_datetime(announcement.get("start_time", ""))
+            if self.debug:
+                self._debug_print(f"使用公告时间作为开始时间: {start_time}")
+        if not end_time:
+            end_time = self._timestamp_to_datetime(announcement.get("end_time", ""))
+            if self.debug:
+                self._debug_print(f"使用公告时间作为结束时间: {end_time}")
+
+        self._debug_print("已添加到祈愿公告结果")
+        return {
+            "ann_id": ann_id,
+            "title": title,
+            "start_time": start_time,
+            "end_time": end_time,
+            "bannerImage": banner_image,
+            "event_type": "gacha",
+            "content": self._dump_content(raw_data["content_map"].get(ann_id, {})),
+            "lang": lang,
+        }
 
     def _get_target_lang_announcement(
         self, zh_announcement: Dict, raw_data: Dict, lang: str
@@ -364,19 +426,13 @@ class GenshinParser:
         if lang == "zh-cn":
             return zh_announcement
 
-        if "list" not in raw_data or "data" not in raw_data["list"]:
-            return None
+        # 在目标语言公告索引中查找对应的公告（索引在parse开始时建立）
+        return self._target_index.get(zh_announcement["ann_id"])
 
-        # 在目标语言列表中查找对应的公告
-        ann_id = zh_announcement["ann_id"]
-        for item in raw_data["list"]["data"]["list"]:
-            for announcement in item["list"]:
-                if announcement["ann_id"] == ann_id:
-                    return announcement
-        return None
-
-    def _parse_gacha_content(self, zh_title: str, zh_content: Dict) -> str:
-        """使用中文内容解析祈愿公告并生成标准化标题"""
+    def _parse_gacha_content(
+        self, zh_title: str, zh_content: Dict, soup: Optional[BeautifulSoup]
+    ) -> str:
+        """使用中文内容（及其解析树）解析祈愿公告并生成标准化标题"""
         if not zh_content or not isinstance(zh_content, dict):
             self._debug_print("无中文内容或内容格式错误，使用基本标准化标题")
             return self._standardize_gacha_title(zh_title)
@@ -391,37 +447,40 @@ class GenshinParser:
         # 处理不同类型的祈愿
         if "神铸赋形" in zh_title:  # 武器祈愿
             self._debug_print("检测到武器祈愿")
-            weapon_names = re.findall(r"「[^」]*·([^」]*)」", zh_title)
+            weapon_names = _RE_WEAPON_NAME.findall(zh_title)
             result = f"【神铸赋形】武器祈愿: {', '.join(weapon_names)}"
-            self._debug_print(f"武器名称提取结果: {weapon_names}")
+            if self.debug:
+                self._debug_print(f"武器名称提取结果: {weapon_names}")
             return result
         elif "集录" in zh_title:  # 集录祈愿
             self._debug_print("检测到集录祈愿")
-            match = re.search(r"「([^」]+)」祈愿", zh_title)
+            match = _RE_GACHA_NAME.search(zh_title)
             gacha_name = match.group(1) if match else "集录祈愿"
             result = f"【{gacha_name}】集录祈愿"
-            self._debug_print(f"集录祈愿名称: {gacha_name}")
+            if self.debug:
+                self._debug_print(f"集录祈愿名称: {gacha_name}")
             return result
         else:  # 角色祈愿
             self._debug_print("检测到角色祈愿")
             # 尝试从中文内容中提取角色名
-            soup = BeautifulSoup(html_content, "html.parser")
             character_name = ""
 
             # 查找包含角色名的段落
             for p in soup.find_all("p"):
                 text = p.get_text(strip=True)
                 if "·" in text and "(" in text:
-                    char_match = re.search(r"·(.*?)\(", text)
+                    char_match = _RE_CHAR_NAME.search(text)
                     if char_match:
                         character_name = char_match.group(1).strip()
-                        self._debug_print(f"从段落中提取角色名: {character_name}")
+                        if self.debug:
+                            self._debug_print(f"从段落中提取角色名: {character_name}")
                         break
 
             # 从中文标题中提取祈愿名称
-            gacha_match = re.search(r"「([^」]+)」祈愿", zh_title)
+            gacha_match = _RE_GACHA_NAME.search(zh_title)
             gacha_name = gacha_match.group(1) if gacha_match else "角色祈愿"
-            self._debug_print(f"祈愿名称: {gacha_name}")
+            if self.debug:
+                self._debug_print(f"祈愿名称: {gacha_name}")
 
             return (
                 f"【{gacha_name}】角色祈愿: {character_name}"
@@ -454,7 +513,8 @@ class GenshinParser:
         is_valid = ("时限内" in zh_title or "活动" in zh_title) and not any(
             kw in zh_title for kw in invalid_keywords
         )
-        self._debug_print(f"活动有效性检查: {'有效' if is_valid else '无效'}")
+        if self.debug:
+            self._debug_print(f"活动有效性检查: {'有效' if is_valid else '无效'}")
         return is_valid
 
     def _parse_content_time(self, time_str: str) -> str:
@@ -465,23 +525,25 @@ class GenshinParser:
 
         try:
             # 尝试解析格式如 "2023年11月15日10:00"
-            time_str = time_str.replace("年", "-").replace("月", "-").replace("日", "")
+            time_str = time_str.translate(_CN_DATE_TRANS_DASH)
             date_obj = datetime.strptime(time_str, "%Y-%m-%d%H:%M")
             result = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-            self._debug_print(f"解析时间字符串成功: {time_str} -> {result}")
+            if self.debug:
+                self._debug_print(f"解析时间字符串成功: {time_str} -> {result}")
             return result
         except ValueError as e:
-            self._debug_print(f"解析时间字符串失败: {time_str}, 错误: {str(e)}")
+            if self.debug:
+                self._debug_print(f"解析时间字符串失败: {time_str}, 错误: {str(e)}")
             return ""
 
     @staticmethod
-    def _extract_version_number(text: str) -> List[float]:
-        """从中文文本中提取版本号"""
-        version_pattern = r"(\d+\.\d+)"
-        versions = re.findall(version_pattern, text)
-        return [float(v) for v in versions] if versions else []
+    @functools.lru_cache(maxsize=128)
+    def _extract_version_number(text: str) -> Tuple[float, ...]:
+        """从中文文本中提取版本号（结果按文本缓存，返回不可变元组）"""
+        return tuple(float(v) for v in _RE_VERSION.findall(text))
 
     @staticmethod
+    @functools.lru_cache(maxsize=512)
     def _timestamp_to_datetime(timestamp: Union[str, int]) -> str:
         """将时间戳转换为日期时间字符串"""
         if not timestamp:
@@ -489,16 +551,21 @@ class GenshinParser:
 
         if isinstance(timestamp, str):
             try:
-                # 尝试解析格式如 "2023-11-15 10:00:00"
-                dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+                # 尝试解析格式如 "2023-11-15 10:00:00"；标准格式直接用fromisoformat校验，
+                # 其余写法（如月日不补零）仍交给strptime
+                if _RE_ISO_TIMESTAMP.fullmatch(timestamp):
+                    datetime.fromisoformat(timestamp)
+                else:
+                    datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
                 return timestamp
             except ValueError:
                 return ""
         else:
             try:
-                # 处理毫秒时间戳
-                dt = datetime.fromtimestamp(timestamp / 1000)
-                return dt.strftime("%Y-%m-%d %H:%M:%S")
+                # 处理毫秒时间戳（整除到秒，避免浮点除法和中间datetime对象；仍按本地时区输出）
+                return time.strftime(
+                    "%Y-%m-%d %H:%M:%S", time.localtime(timestamp // 1000)
+                )
             except (ValueError, TypeError):
                 return ""
 
@@ -507,19 +574,32 @@ class GenshinParser:
         ann_id = announcement["ann_id"]
         zh_content = raw_data["zh_content_map"].get(ann_id, {})
         if zh_content and "title" in zh_content:
-            self._debug_print(f"从中文内容映射获取标题: {zh_content['title']}")
+            if self.debug:
+                self._debug_print(f"从中文内容映射获取标题: {zh_content['title']}")
             return zh_content["title"]
-        self._debug_print(f"使用默认标题: {announcement['title']}")
+        if self.debug:
+            self._debug_print(f"使用默认标题: {announcement['title']}")
         return announcement["title"]
 
+    @staticmethod
+    def _dump_content(announcement: Dict) -> str:
+        """序列化公告内容，只保留_CONTENT_KEEP中的字段"""
+        return orjson.dumps(
+            {key: announcement[key] for key in _CONTENT_KEEP if key in announcement}
+        ).decode()
+
     @staticmethod
     def _remove_html_tags(text: str) -> str:
         """移除HTML标签"""
-        clean = re.compile("<.*?>")
-        return re.sub(clean, "", text).strip()
+        # 标题和时间文本大多不含标签，无需经过正则
+        if "<" not in text:
+            return text.strip()
+        return _RE_HTML_TAG.sub("", text).strip()
 
-    def _extract_event_start_time(self, html_content: str) -> str:
-        """从活动公告HTML内容中提取开始时间"""
+    def _extract_event_start_time(
+        self, html_content: str, soup: Optional[BeautifulSoup]
+    ) -> str:
+        """从活动公告HTML内容（及其解析树）中提取开始时间"""
         if not html_content:
             return ""
 
@@ -528,18 +608,12 @@ class GenshinParser:
             return self.version_begin_time
 
         # 尝试直接匹配时间格式 "2023/11/15 10:00"
-        time_pattern = r"\d{4}/\d{2}/\d{2} \d{2}:\d{2}"
-        match = re.search(time_pattern, html_content)
+        match = _RE_SLASH_TIME.search(html_content)
         if match:
             return self._format_extracted_time(match.group())
 
-        # 使用BeautifulSoup解析HTML
-        soup = BeautifulSoup(html_content, "html.parser")
-
         # 查找包含"〓获取奖励时限〓"或"〓活动时间〓"的标签
-        time_title = soup.find(string="〓获取奖励时限〓") or soup.find(
-            string="〓活动时间〓"
-        )
+        time_title = self._find_time_title(html_content, soup)
         if time_title:
             time_paragraph = time_title.find_next("p")
             if time_paragraph:
@@ -553,15 +627,61 @@ class GenshinParser:
 
         return ""
 
+    def _find_time_title(self, html_content: str, soup: BeautifulSoup):
+        """
+        查找时间标记所在的文本节点；原始HTML中不含该标记时直接跳过，不遍历解析树
+
+        EVENT_STRAINER只保留p、td、t、span标签，标记位于div、h3等标签中时精简解析树里
+        找不到它，此时改用不限标签的完整解析树查找
+        """
+        for marker in _TIME_MARKERS:
+            if marker in html_content:
+                time_title = soup.find(string=marker)
+                if time_title is None:
+                    time_title = self._build_full_soup(html_content).find(string=marker)
+                if time_title:
+                    return time_title
+        return None
+
+    def _build_full_soup(self, html_content: str) -> BeautifulSoup:
+        """不限标签解析HTML内容，同一内容在单次parse内只解析一次"""
+        soup = self._full_soup_cache.get(html_content)
+        if soup is None:
+            soup = BeautifulSoup(html_content, "lxml")
+            self._full_soup_cache[html_content] = soup
+        return soup
+
+    def _match_gacha_start_time(self, html_content: str, is_collection: bool) -> str:
+        """
+        直接在原始HTML中匹配常规祈愿的开始时间
+
+        与解析树相同，按rowspan为3、5、9的顺序取第一个时间单元格，只认"~"之前唯一的
+        "2023/11/15 10:00"格式时间；集录祈愿、"版本更新后"以及单元格内容不符合预期时
+        返回空字符串，交由解析树处理
+        """
+        if is_collection or not html_content or "更新后" in html_content:
+            return ""
+
+        for cell_re in _RE_GACHA_TIME_CELLS:
+            match = cell_re.search(html_content)
+            if match:
+                break
+        else:
+            return ""
+
+        cell = match.group(1)
+        if "~" not in cell or not any(tag in cell for tag in _GACHA_TIME_CHILD_TAGS):
+            return ""
+        times = _RE_SLASH_TIME.findall(cell.split("~", 1)[0])
+        return self._format_extracted_time(times[0]) if len(times) == 1 else ""
+
     def _extract_gacha_start_time(
-        self, html_content: str, is_collection: bool = False
+        self, soup: Optional[BeautifulSoup], is_collection: bool = False
     ) -> str:
-        """从祈愿公告HTML内容中提取开始时间"""
-        if not html_content:
+        """从祈愿公告HTML解析树中提取开始时间"""
+        if soup is None:
             return ""
 
-        soup = BeautifulSoup(html_content, "html.parser")
-
         if is_collection:
             # 集录祈愿的特殊处理
             time_td = soup.find("td", {"rowspan": lambda x: x and int(x) >= 3})
@@ -571,21 +691,22 @@ class GenshinParser:
                     return self._format_extracted_time(time_tag.text)
 
                 time_text = time_td.get_text()
-                time_match = re.search(r"\d{4}/\d{2}/\d{2} \d{2}:\d{2}", time_text)
+                time_match = _RE_SLASH_TIME.search(time_text)
                 if time_match:
                     return self._format_extracted_time(time_match.group())
         else:
-            # 常规祈愿处理
-            for rowspan in ["3", "5", "9"]:
-                td_element = soup.find("td", {"rowspan": rowspan})
+            # 常规祈愿处理：一次遍历取得每种rowspan的第一个单元格，再按优先级查找
+            rowspan_tds = {}
+            for td in soup.find_all("td", rowspan=True):
+                rowspan_tds.setdefault(td["rowspan"], td)
+            for rowspan in ("3", "5", "9"):
+                td_element = rowspan_tds.get(rowspan)
                 if td_element:
                     time_texts = []
-                    for child in td_element.children:
-                        if child.name in ["p", "t"]:
-                            span = child.find("span")
-                            time_texts.append(
-                                span.get_text() if span else child.get_text()
-                            )
+                    # 只遍历p、t子标签，跳过单元格中的文本节点
+                    for child in td_element.find_all(("p", "t"), recursive=False):
+                        span = child.find("span")
+                        time_texts.append(span.get_text() if span else child.get_text())
 
                     if time_texts:
                         time_range = " ".join(time_texts)
@@ -606,24 +727,36 @@ class GenshinParser:
         if f"{self.version_now}版本" in time_str or "版本更新后" in time_str:
             return self.version_begin_time
 
+        result = self._parse_slash_time(time_str)
+        if not result and self.debug:
+            self._debug_print(f"时间格式解析失败: {time_str}")
+        return result
+
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _parse_slash_time(time_str: str) -> str:
+        """将"2023/11/15 10:00"或"2023年11月15日 10:00"格式的时间转换为标准格式，失败时返回空字符串"""
         try:
             # 统一处理各种时间格式
-            time_str = time_str.replace("年", "/").replace("月", "/").replace("日", "")
-            time_str = re.sub(r"[^\d/ :]", "", time_str).strip()
+            time_str = time_str.translate(_CN_DATE_TRANS_SLASH)
+            time_str = _RE_NON_TIME_CHARS.sub("", time_str).strip()
 
-            # 尝试解析格式 "2023/11/15 10:00"
+            # 尝试解析格式 "2023/11/15 10:00"，按固定格式切分，构造datetime仅用于校验日期
             if time_str[-1:] == "/":
                 time_str = time_str[:-1]
-            date_obj = datetime.strptime(time_str, "%Y/%m/%d %H:%M")
-            return date_obj.strftime("%Y-%m-%d %H:%M:%S")
+            match = _RE_SLASH_TIME_PARTS.fullmatch(time_str)
+            if not match:
+                return ""
+            year, month, day, hour, minute = map(int, match.groups())
+            datetime(year, month, day, hour, minute)
+            return f"{year:04d}-{month:02d}-{day:02d} {hour:02d}:{minute:02d}:00"
         except ValueError:
-            self._debug_print(f"时间格式解析失败: {time_str}")
             return ""
 
     def _get_time_from_zh_content(
-        self, announcement: Dict, zh_content: Dict
+        self, announcement: Dict, zh_content: Dict, soup: Optional[BeautifulSoup]
     ) -> Tuple[str, str]:
-        """从中文公告内容中提取时间信息"""
+        """从中文公告内容（及其解析树）中提取时间信息"""
         if not zh_content or not isinstance(zh_content, dict):
             return "", ""
 
@@ -641,22 +774,26 @@ class GenshinParser:
             ) == "扭蛋" or "祈愿" in zh_content.get("title", "")
             is_collection = "集录" in zh_content.get("title", "")
 
-            if is_gacha:
-                extracted_time = self._extract_gacha_start_time(
-                    html_content, is_collection
-                )
-            else:
-                extracted_time = self._extract_event_start_time(html_content)
+            # 常规祈愿的开始时间通常直接出现在原始HTML中，命中时无需遍历解析树
+            extracted_time = (
+                self._match_gacha_start_time(html_content, is_collection)
+                if is_gacha
+                else ""
+            )
+            if not extracted_time:
+                if soup is None:
+                    soup = self._build_soup(announcement["ann_id"], html_content)
+                if is_gacha:
+                    extracted_time = self._extract_gacha_start_time(soup, is_collection)
+                else:
+                    extracted_time = self._extract_event_start_time(html_content, soup)
 
             if extracted_time:
                 start_time = extracted_time
 
                 # 对于活动公告，尝试提取结束时间
-                if not is_gacha:
-                    soup = BeautifulSoup(html_content, "html.parser")
-                    time_title = soup.find(string="〓获取奖励时限〓") or soup.find(
-                        string="〓活动时间〓"
-                    )
+                if not is_gacha and soup is not None:
+                    time_title = self._find_time_title(html_content, soup)
                     if time_title:
                         time_paragraph = time_title.find_next("p")
                         if time_paragraph and "~" in time_paragraph.get_text():
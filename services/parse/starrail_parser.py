@@ -1,8 +1,27 @@
 import re
 import json
+import functools
+import orjson
 from datetime import datetime
 from bs4 import BeautifulSoup
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# 预编译的正则表达式
+_RE_HTML_TAG = re.compile(r"<.*?>")
+_RE_ESCAPED_TAG = re.compile(r"&lt;.*?&gt;")
+_RE_VERSION = re.compile(r"(\d+\.\d+)")
+_RE_EVENT_TIME = re.compile(
+    r"<h1[^>]*>(?:活动时间|限时活动期)</h1>\s*<p[^>]*>(.*?)</p>", re.DOTALL
+)
+_RE_GACHA_TIME = re.compile(r"时间为(.*?)，包含如下内容")
+_RE_GACHA_NAME = re.compile(r"<h1[^>]*>「([^」]+)」[^<]*活动跃迁</h1>")
+_RE_FIVE_STAR_CHAR = re.compile(r"限定5星角色「([^（」]+)")
+_RE_FIVE_STAR_CONE = re.compile(r"限定5星光锥「([^（」]+)")
+_RE_NON_TIME_CHARS = re.compile(r"[^\d/ :]")
+# 标准时间字符串 "2023-11-15 10:00:00"，形状与strptime的"%Y-%m-%d %H:%M:%S"完全一致
+_RE_ISO_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", re.ASCII)
+# 标题中含有这些关键词的公告不视为活动公告，合并为一个正则一次扫描
+_RE_INVALID_EVENT_KEYWORDS = re.compile("跃迁|模拟宇宙|礼包|纪行|限时折扣|任务|音乐")
 
 
 class StarRailParser:
@@ -13,6 +32,8 @@ class StarRailParser:
         self.version_begin_time = ""
         self.supported_languages = ["zh-cn", "zh-tw", "en", "ja", "ko"]
         self.debug = debug  # 调试模式开关
+        self._target_index = {}  # 单次parse内目标语言公告按ann_id建立的索引
+        self._target_pic_index = {}  # 单次parse内目标语言图片公告的索引
 
     def _debug_print(self, *args, **kwargs):
         """调试输出"""
@@ -51,15 +72,23 @@ class StarRailParser:
         """
         lang_mapper = {"zh-Hans": "zh-cn", "zh-Hant": "zh-tw"}
         lang = lang_mapper.get(lang, lang)
-        self._debug_print(f"开始解析星穹铁道公告数据，语言: {lang}")
-        self._debug_print(f"原始数据键: {raw_data.keys()}")
+        if self.debug:
+            self._debug_print(f"开始解析星穹铁道公告数据，语言: {lang}")
+            self._debug_print(f"原始数据键: {raw_data.keys()}")
 
         if lang not in self.supported_languages:
             lang = "zh-cn"
-            self._debug_print(f"不支持的语言，已重置为默认语言: {lang}")
+            if self.debug:
+                self._debug_print(f"不支持的语言，已重置为默认语言: {lang}")
 
         filtered_list = []
 
+        # 目标语言公告按ann_id建立索引，查找时无需逐个遍历
+        if lang != "zh-cn":
+            self._target_index, self._target_pic_index = self._build_target_index(
+                raw_data
+            )
+
         # 1. 处理版本公告
         self._debug_print("\n=== 开始解析版本公告 ===")
         self._parse_version_announcements(raw_data, filtered_list, lang)
@@ -68,17 +97,35 @@ class StarRailParser:
         self._debug_print("\n=== 开始解析活动公告 ===")
         self._parse_normal_announcements(raw_data, filtered_list, lang)
 
-        # 3. 处理图片列表中的活动公告
-        self._debug_print("\n=== 开始解析图片活动公告 ===")
+        # 3. 一次遍历图片列表，处理其中的活动公告和跃迁(抽卡)公告
+        self._debug_print("\n=== 开始解析图片活动公告和跃迁公告 ===")
         self._parse_pic_announcements(raw_data, filtered_list, lang)
 
-        # 4. 处理跃迁(抽卡)公告
-        self._debug_print("\n=== 开始解析跃迁公告 ===")
-        self._parse_gacha_announcements(raw_data, filtered_list, lang)
-
-        self._debug_print(f"\n解析完成，共找到 {len(filtered_list)} 条公告")
+        if self.debug:
+            self._debug_print(f"\n解析完成，共找到 {len(filtered_list)} 条公告")
+        self._target_index = {}
+        self._target_pic_index = {}
         return filtered_list
 
+    @staticmethod
+    def _build_target_index(raw_data: Dict) -> Tuple[Dict, Dict]:
+        """将目标语言的公告列表和图片公告列表分别按ann_id建立索引（同一ID保留首次出现的公告）"""
+        if "list" not in raw_data or "data" not in raw_data["list"]:
+            return {}, {}
+
+        list_data = raw_data["list"]["data"]
+        index = {}
+        for item in list_data["list"]:
+            for announcement in item["list"]:
+                index.setdefault(announcement["ann_id"], announcement)
+
+        pic_index = {}
+        for item in list_data["pic_list"]:
+            for type_item in item["type_list"]:
+                for announcement in type_item["list"]:
+                    pic_index.setdefault(announcement["ann_id"], announcement)
+        return index, pic_index
+
     def _parse_version_announcements(
         self, raw_data: Dict, result_list: List[Dict], lang: str
     ):
@@ -90,21 +137,26 @@ class StarRailParser:
             return
 
         version_list = zh_list_data["data"]["list"]
-        self._debug_print(f"找到 {len(version_list)} 个公告类别")
+        if self.debug:
+            self._debug_print(f"找到 {len(version_list)} 个公告类别")
 
         for item in version_list:
-            self._debug_print(f"\n处理公告类别: {item['type_label']}")
+            if self.debug:
+                self._debug_print(f"\n处理公告类别: {item['type_label']}")
             if item["type_label"] == "公告":
-                self._debug_print(f"找到公告类别，包含 {len(item['list'])} 条公告")
+                if self.debug:
+                    self._debug_print(f"找到公告类别，包含 {len(item['list'])} 条公告")
 
                 for announcement in item["list"]:
                     ann_id = announcement["ann_id"]
-                    self._debug_print(f"处理公告 ID: {ann_id}")
+                    if self.debug:
+                        self._debug_print(f"处理公告 ID: {ann_id}")
 
                     # 使用中文标题提取版本号
                     zh_title = self._get_zh_title(announcement, raw_data)
                     clean_zh_title = self._remove_html_tags(zh_title)
-                    self._debug_print(f"中文标题: {clean_zh_title}")
+                    if self.debug:
+                        self._debug_print(f"中文标题: {clean_zh_title}")
 
                     if "版本更新说明" in clean_zh_title:
                         self._debug_print("检测到版本更新公告")
@@ -113,7 +165,8 @@ class StarRailParser:
                         version_numbers = self._extract_version_number(clean_zh_title)
                         if version_numbers:
                             self.version_now = str(version_numbers[0])
-                            self._debug_print(f"提取到版本号: {self.version_now}")
+                            if self.debug:
+                                self._debug_print(f"提取到版本号: {self.version_now}")
                         else:
                             self._debug_print("警告: 无法从标题中提取版本号")
 
@@ -122,18 +175,21 @@ class StarRailParser:
                             announcement, raw_data, lang
                         )
                         if not target_announcement:
-                            self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
+                            if self.debug:
+                                self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
                             continue
 
                         # 获取目标语言的标题
                         title = self._remove_html_tags(target_announcement["title"])
-                        self._debug_print(f"目标语言标题: {title}")
+                        if self.debug:
+                            self._debug_print(f"目标语言标题: {title}")
 
                         # 获取横幅图片（优先使用目标语言的图片）
                         banner_image = target_announcement.get(
                             "banner", announcement.get("banner", "")
                         )
-                        self._debug_print(f"横幅图片: {banner_image[:50]}...")
+                        if self.debug:
+                            self._debug_print(f"横幅图片: {banner_image[:50]}...")
 
                         # 获取时间
                         start_time = self._timestamp_to_datetime(
@@ -142,7 +198,8 @@ class StarRailParser:
                         end_time = self._timestamp_to_datetime(
                             announcement.get("end_time", "")
                         )
-                        self._debug_print(f"时间范围: {start_time} 至 {end_time}")
+                        if self.debug:
+                            self._debug_print(f"时间范围: {start_time} 至 {end_time}")
 
                         parsed = {
                             "ann_id": ann_id,
@@ -153,16 +210,15 @@ class StarRailParser:
                             "end_time": end_time,
                             "bannerImage": banner_image,
                             "event_type": "version",
-                            "content": json.dumps(
-                                target_announcement, ensure_ascii=False
-                            ),
+                            "content": orjson.dumps(target_announcement).decode(),
                             "lang": lang,
                         }
 
                         self.version_begin_time = start_time
                         result_list.append(parsed)
                         self._debug_print("已添加到结果列表")
-                        break
+                        # 版本公告只取一条，找到后无需再遍历其余类别
+                        return
 
     def _parse_normal_announcements(
         self, raw_data: Dict, result_list: List[Dict], lang: str
@@ -175,27 +231,34 @@ class StarRailParser:
             return
 
         event_list = zh_list_data["data"]["list"]
-        self._debug_print(f"找到 {len(event_list)} 个公告类别")
+        if self.debug:
+            self._debug_print(f"找到 {len(event_list)} 个公告类别")
+        zh_content_map = raw_data["zh_content_map"]
+        content_map = raw_data["content_map"]
 
         for item in event_list:
             if item["type_label"] == "公告":
-                self._debug_print(f"找到公告类别，包含 {len(item['list'])} 条公告")
+                if self.debug:
+                    self._debug_print(f"找到公告类别，包含 {len(item['list'])} 条公告")
 
                 for announcement in item["list"]:
                     ann_id = announcement["ann_id"]
-                    self._debug_print(f"\n处理公告 ID: {ann_id}")
+                    if self.debug:
+                        self._debug_print(f"\n处理公告 ID: {ann_id}")
 
                     # 获取中文内容
-                    zh_content = raw_data["zh_content_map"].get(ann_id, {})
+                    zh_content = zh_content_map.get(ann_id, {})
                     if not zh_content:
-                        self._debug_print(f"警告: 公告 {ann_id} 无中文内容数据")
+                        if self.debug:
+                            self._debug_print(f"警告: 公告 {ann_id} 无中文内容数据")
                         continue
 
                     # 使用中文标题判断是否为有效活动
                     zh_title = self._remove_html_tags(
                         zh_content.get("title", announcement["title"])
                     )
-                    self._debug_print(f"中文标题: {zh_title}")
+                    if self.debug:
+                        self._debug_print(f"中文标题: {zh_title}")
 
                     if not self._is_valid_event(zh_title):
                         self._debug_print("非有效活动公告，跳过")
@@ -206,37 +269,30 @@ class StarRailParser:
                         announcement, raw_data, lang
                     )
                     if not target_announcement:
-                        self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
+                        if self.debug:
+                            self._debug_print(f"警告: 找不到 {lang} 语言的公告数据")
                         continue
 
                     # 获取目标语言的标题
                     title = self._remove_html_tags(target_announcement["title"])
-                    self._debug_print(f"目标语言标题: {title}")
+                    if self.debug:
+                        self._debug_print(f"目标语言标题: {title}")
 
                     # 获取横幅图片（优先使用目标语言的图片）
                     banner_image = target_announcement.get(
                         "banner", announcement.get("banner", "")
                     )
-                    self._debug_print(f"横幅图片: {banner_image[:50]}...")
+                    if self.debug:
+                        self._debug_print(f"横幅图片: {banner_image[:50]}...")
 
                     # 获取时间（从中文内容中提取）
                     start_time, end_time = self._get_time_from_zh_content(
                         announcement, zh_content
                     )
-                    self._debug_print(
-                        f"从中文内容提取的时间: {start_time} 至 {end_time}"
-                    )
-
-                    if not start_time:
-                        start_time = self._timestamp_to_datetime(
-                            announcement.get("start_time", "")
-                        )
-                        self._debug_print(f"使用公告时间作为开始时间: {start_time}")
-                    if not end_time:
-                        end_time = self._timestamp_to_datetime(
-                            announcement.get("end_time", "")
+                    if self.debug:
+                        self._debug_print(
+                            f"从中文内容提取的时间: {start_time} 至 {end_time}"
                         )
-                        self._debug_print(f"使用公告时间作为结束时间: {end_time}")
 
                     parsed = {
                         "ann_id": ann_id,
@@ -245,9 +301,7 @@ class StarRailParser:
                         "end_time": end_time,
                         "bannerImage": banner_image,
                         "event_type": "event",
-                        "content": json.dumps(
-                            raw_data["content_map"].get(ann_id, {}), ensure_ascii=False
-                        ),
+                        "content": orjson.dumps(content_map.get(ann_id, {})).decode(),
                         "lang": lang,
                     }
 
@@ -257,7 +311,7 @@ class StarRailParser:
     def _parse_pic_announcements(
         self, raw_data: Dict, result_list: List[Dict], lang: str
     ):
-        """解析图片列表中的活动公告"""
+        """一次遍历图片列表，解析其中的活动公告和跃迁(抽卡)公告"""
         # 使用中文列表数据进行解析
         zh_list_data = raw_data.get("zh_list", raw_data["list"])
         if "data" not in zh_list_data:
@@ -265,182 +319,155 @@ class StarRailParser:
             return
 
         pic_list = zh_list_data["data"]["pic_list"]
-        self._debug_print(f"找到 {len(pic_list)} 个图片公告类别")
+        if self.debug:
+            self._debug_print(f"找到 {len(pic_list)} 个图片公告类别")
+        zh_pic_content_map = raw_data["zh_pic_content_map"]
 
+        # 每条图片公告只处理一次，按原顺序先输出活动再输出跃迁
+        event_results = []
+        gacha_results = []
         for item in pic_list:
             for type_item in item["type_list"]:
                 for announcement in type_item["list"]:
                     ann_id = announcement["ann_id"]
-                    self._debug_print(f"\n处理图片公告 ID: {ann_id}")
+                    if self.debug:
+                        self._debug_print(f"\n处理图片公告 ID: {ann_id}")
 
                     # 获取中文内容
-                    zh_content = raw_data["zh_pic_content_map"].get(ann_id, {})
+                    zh_content = zh_pic_content_map.get(ann_id, {})
                     if not zh_content:
-                        self._debug_print(f"警告: 图片公告 {ann_id} 无中文内容数据")
+                        if self.debug:
+                            self._debug_print(f"警告: 图片公告 {ann_id} 无中文内容数据")
                         continue
 
-                    # 使用中文标题判断是否为有效活动
+                    # 使用中文标题判断公告类型（"跃迁"是活动的排除关键词，两者互斥）
                     zh_title = self._remove_html_tags(
                         zh_content.get("title", announcement["title"])
                     )
-                    self._debug_print(f"中文标题: {zh_title}")
-
-                    if not self._is_valid_event(zh_title):
-                        self._debug_print("非有效活动公告，跳过")
-                        continue
-
-                    # 获取目标语言的公告数据
-                    target_announcement = self._get_target_lang_pic_announcement(
-                        announcement, raw_data, lang
-                    )
-                    if not target_announcement:
-                        self._debug_print(f"警告: 找不到 {lang} 语言的图片公告数据")
-                        continue
+                    if self.debug:
+                        self._debug_print(f"中文标题: {zh_title}")
 
-                    # 获取目标语言的标题
-                    title = self._remove_html_tags(target_announcement["title"])
-                    self._debug_print(f"目标语言标题: {title}")
-
-                    # 获取横幅图片（优先使用目标语言的图片）
-                    banner_image = target_announcement.get(
-                        "img", announcement.get("img", "")
-                    )
-                    self._debug_print(f"横幅图片: {banner_image[:50]}...")
-
-                    # 获取时间（从中文内容中提取）
-                    start_time, end_time = self._get_time_from_zh_content(
-                        announcement, zh_content
-                    )
-                    self._debug_print(
-                        f"从中文内容提取的时间: {start_time} 至 {end_time}"
-                    )
-
-                    if not start_time:
-                        start_time = self._timestamp_to_datetime(
-                            announcement.get("start_time", "")
+                    if "跃迁" in zh_title:
+                        parsed = self._parse_gacha_announcement(
+                            announcement, zh_content, zh_title, raw_data, lang
                         )
-                        self._debug_print(f"使用公告时间作为开始时间: {start_time}")
-                    if not end_time:
-                        end_time = self._timestamp_to_datetime(
-                            announcement.get("end_time", "")
+                        if parsed:
+                            gacha_results.append(parsed)
+                    elif self._is_valid_event(zh_title):
+                        parsed = self._parse_pic_event_announcement(
+                            announcement, zh_content, raw_data, lang
                         )
-                        self._debug_print(f"使用公告时间作为结束时间: {end_time}")
-
-                    parsed = {
-                        "ann_id": ann_id,
-                        "title": title,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "bannerImage": banner_image,
-                        "event_type": "event",
-                        "content": json.dumps(
-                            raw_data["pic_content_map"].get(ann_id, {}),
-                            ensure_ascii=False,
-                        ),
-                        "lang": lang,
-                    }
-
-                    result_list.append(parsed)
-                    self._debug_print("已添加到结果列表")
-
-    def _parse_gacha_announcements(
-        self, raw_data: Dict, result_list: List[Dict], lang: str
-    ):
-        """解析跃迁(抽卡)公告"""
-        # 使用中文列表数据进行解析
-        zh_list_data = raw_data.get("zh_list", raw_data["list"])
-        if "data" not in zh_list_data:
-            self._debug_print("警告: 缺少data字段，无法解析跃迁公告")
-            return
-
-        # 1. 从图片公告中查找
-        pic_list = zh_list_data["data"]["pic_list"]
-        self._debug_print(f"找到 {len(pic_list)} 个图片公告类别")
-
-        for item in pic_list:
-            for type_item in item["type_list"]:
-                for announcement in type_item["list"]:
-                    ann_id = announcement["ann_id"]
-                    self._debug_print(f"\n处理图片公告 ID: {ann_id}")
+                        if parsed:
+                            event_results.append(parsed)
+                    else:
+                        self._debug_print("非有效活动或跃迁公告，跳过")
 
-                    # 获取中文内容
-                    zh_content = raw_data["zh_pic_content_map"].get(ann_id, {})
-                    if not zh_content:
-                        self._debug_print(f"警告: 图片公告 {ann_id} 无中文内容数据")
-                        continue
+        result_list.extend(event_results)
+        result_list.extend(gacha_results)
 
-                    # 使用中文标题判断是否为跃迁公告
-                    zh_title = self._remove_html_tags(
-                        zh_content.get("title", announcement["title"])
-                    )
-                    self._debug_print(f"中文标题: {zh_title}")
+    def _parse_pic_event_announcement(
+        self, announcement: Dict, zh_content: Dict, raw_data: Dict, lang: str
+    ) -> Optional[Dict]:
+        """解析单条图片活动公告，找不到目标语言数据时返回None"""
+        ann_id = announcement["ann_id"]
 
-                    if "跃迁" not in zh_title:
-                        self._debug_print("非跃迁公告，跳过")
-                        continue
+        # 获取目标语言的公告数据
+        target_announcement = self._get_target_lang_pic_announcement(
+            announcement, raw_data, lang
+        )
+        if not target_announcement:
+            if self.debug:
+                self._debug_print(f"警告: 找不到 {lang} 语言的图片公告数据")
+            return None
 
-                    # 获取目标语言的公告数据
-                    target_announcement = self._get_target_lang_pic_announcement(
-                        announcement, raw_data, lang
-                    )
-                    if not target_announcement:
-                        self._debug_print(f"警告: 找不到 {lang} 语言的图片公告数据")
-                        continue
+        # 获取目标语言的标题
+        title = self._remove_html_tags(target_announcement["title"])
+        if self.debug:
+            self._debug_print(f"目标语言标题: {title}")
 
-                    # 获取目标语言的标题
-                    title = self._remove_html_tags(target_announcement["title"])
-                    self._debug_print(f"目标语言标题: {title}")
+        # 获取横幅图片（优先使用目标语言的图片）
+        banner_image = target_announcement.get("img", announcement.get("img", ""))
+        if self.debug:
+            self._debug_print(f"横幅图片: {banner_image[:50]}...")
 
-                    # 如果是中文，使用专门解析的标题
-                    if lang in ["zh-cn"]:
-                        title = self._parse_gacha_content(zh_title, zh_content)
-                        self._debug_print(f"中文跃迁公告，使用解析后的标题: {title}")
-                    else:
-                        self._debug_print(f"非中文跃迁公告，保持原标题: {title}")
+        # 获取时间（从中文内容中提取）
+        start_time, end_time = self._get_time_from_zh_content(announcement, zh_content)
+        if self.debug:
+            self._debug_print(f"从中文内容提取的时间: {start_time} 至 {end_time}")
+
+        parsed = {
+            "ann_id": ann_id,
+            "title": title,
+            "start_time": start_time,
+            "end_time": end_time,
+            "bannerImage": banner_image,
+            "event_type": "event",
+            "content": orjson.dumps(
+                raw_data["pic_content_map"].get(ann_id, {})
+            ).decode(),
+            "lang": lang,
+        }
+        return parsed
+
+    def _parse_gacha_announcement(
+        self,
+        announcement: Dict,
+        zh_content: Dict,
+        zh_title: str,
+        raw_data: Dict,
+        lang: str,
+    ) -> Optional[Dict]:
+        """解析单条跃迁(抽卡)公告，找不到目标语言数据时返回None"""
+        ann_id = announcement["ann_id"]
 
-                    # 获取横幅图片（优先使用目标语言的图片）
-                    banner_image = target_announcement.get(
-                        "img", announcement.get("img", "")
-                    )
-                    if not banner_image and "img" in zh_content:
-                        banner_image = zh_content["img"]
-                    self._debug_print(f"横幅图片: {banner_image[:50]}...")
+        # 获取目标语言的公告数据
+        target_announcement = self._get_target_lang_pic_announcement(
+            announcement, raw_data, lang
+        )
+        if not target_announcement:
+            if self.debug:
+                self._debug_print(f"警告: 找不到 {lang} 语言的图片公告数据")
+            return None
 
-                    # 获取时间（从中文内容中提取）
-                    start_time, end_time = self._get_time_from_zh_content(
-                        announcement, zh_content
-                    )
-                    self._debug_print(
-                        f"从中文内容提取的时间: {start_time} 至 {end_time}"
-                    )
+        # 获取目标语言的标题
+        title = self._remove_html_tags(target_announcement["title"])
+        if self.debug:
+            self._debug_print(f"目标语言标题: {title}")
 
-                    if not start_time:
-                        start_time = self._timestamp_to_datetime(
-                            announcement.get("start_time", "")
-                        )
-                        self._debug_print(f"使用公告时间作为开始时间: {start_time}")
-                    if not end_time:
-                        end_time = self._timestamp_to_datetime(
-                            announcement.get("end_time", "")
-                        )
-                        self._debug_print(f"使用公告时间作为结束时间: {end_time}")
+        # 如果是中文，使用专门解析的标题
+        if lang in ["zh-cn"]:
+            title = self._parse_gacha_content(zh_title, zh_content)
+            if self.debug:
+                self._debug_print(f"中文跃迁公告，使用解析后的标题: {title}")
+        else:
+            if self.debug:
+                self._debug_print(f"非中文跃迁公告，保持原标题: {title}")
 
-                    parsed = {
-                        "ann_id": ann_id,
-                        "title": title,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "bannerImage": banner_image,
-                        "event_type": "gacha",
-                        "content": json.dumps(
-                            raw_data["pic_content_map"].get(ann_id, {}),
-                            ensure_ascii=False,
-                        ),
-                        "lang": lang,
-                    }
+        # 获取横幅图片（优先使用目标语言的图片）
+        banner_image = target_announcement.get("img", announcement.get("img", ""))
+        if not banner_image and "img" in zh_content:
+            banner_image = zh_content["img"]
+        if self.debug:
+            self._debug_print(f"横幅图片: {banner_image[:50]}...")
 
-                    result_list.append(parsed)
-                    self._debug_print("已添加到结果列表")
+        # 获取时间（从中文内容中提取）
+        start_time, end_time = self._get_time_from_zh_content(announcement, zh_content)
+        if self.debug:
+            self._debug_print(f"从中文内容提取的时间: {start_time} 至 {end_time}")
+
+        parsed = {
+            "ann_id": ann_id,
+            "title": title,
+            "start_time": start_time,
+            "end_time": end_time,
+            "bannerImage": banner_image,
+            "event_type": "gacha",
+            "content": orjson.dumps(
+                raw_data["pic_content_map"].get(ann_id, {})
+            ).decode(),
+            "lang": lang,
+        }
+        return parsed
 
     def _parse_gacha_content(self, zh_title: str, zh_content: Dict) -> str:
         """使用中文内容解析跃迁公告并生成标准化标题"""
@@ -456,29 +483,34 @@ class StarRailParser:
         self._debug_print("使用中文内容解析跃迁信息...")
 
         # 提取跃迁名称
-        gacha_names = re.findall(
-            r"<h1[^>]*>「([^」]+)」[^<]*活动跃迁</h1>", html_content
-        )
-        self._debug_print(f"从HTML提取的跃迁名称: {gacha_names}")
+        gacha_names = _RE_GACHA_NAME.findall(html_content)
+        if self.debug:
+            self._debug_print(f"从HTML提取的跃迁名称: {gacha_names}")
 
-        # 过滤角色跃迁名称
+        # 过滤角色跃迁名称，同时按首次出现的顺序去重
         role_gacha_names = []
+        seen_names = set()
         for name in gacha_names:
             if "•" not in name:  # 排除光锥跃迁名称
-                role_gacha_names.append(name)
+                role_name = name
             elif "铭心之萃" in name:  # 特殊情况处理
-                role_gacha_names.append(name.split("•")[0])
-        role_gacha_names = list(dict.fromkeys(role_gacha_names))
-        self._debug_print(f"过滤后的角色跃迁名称: {role_gacha_names}")
+                role_name = name.split("•")[0]
+            else:
+                continue
+            if role_name not in seen_names:
+                seen_names.add(role_name)
+                role_gacha_names.append(role_name)
+        if self.debug:
+            self._debug_print(f"过滤后的角色跃迁名称: {role_gacha_names}")
 
         # 提取角色和光锥
-        five_star_characters = re.findall(r"限定5星角色「([^（」]+)", html_content)
-        five_star_characters = list(dict.fromkeys(five_star_characters))
-        self._debug_print(f"提取的5星角色: {five_star_characters}")
+        five_star_characters = self._unique(_RE_FIVE_STAR_CHAR.finditer(html_content))
+        if self.debug:
+            self._debug_print(f"提取的5星角色: {five_star_characters}")
 
-        five_star_light_cones = re.findall(r"限定5星光锥「([^（」]+)", html_content)
-        five_star_light_cones = list(dict.fromkeys(five_star_light_cones))
-        self._debug_print(f"提取的5星光锥: {five_star_light_cones}")
+        five_star_light_cones = self._unique(_RE_FIVE_STAR_CONE.finditer(html_content))
+        if self.debug:
+            self._debug_print(f"提取的5星光锥: {five_star_light_cones}")
 
         # 构建标题
         if role_gacha_names:
@@ -491,7 +523,8 @@ class StarRailParser:
         else:
             title += "跃迁活动"
 
-        self._debug_print(f"最终生成的标题: {title}")
+        if self.debug:
+            self._debug_print(f"最终生成的标题: {title}")
         return title
 
     def _standardize_gacha_title(self, zh_title: str) -> str:
@@ -509,16 +542,8 @@ class StarRailParser:
         if lang == "zh-cn":
             return zh_announcement
 
-        if "list" not in raw_data or "data" not in raw_data["list"]:
-            return None
-
-        # 在目标语言列表中查找对应的公告
-        ann_id = zh_announcement["ann_id"]
-        for item in raw_data["list"]["data"]["list"]:
-            for announcement in item["list"]:
-                if announcement["ann_id"] == ann_id:
-                    return announcement
-        return None
+        # 在目标语言公告索引中查找对应的公告（索引在parse开始时建立）
+        return self._target_index.get(zh_announcement["ann_id"])
 
     def _get_target_lang_pic_announcement(
         self, zh_announcement: Dict, raw_data: Dict, lang: str
@@ -527,30 +552,24 @@ class StarRailParser:
         if lang == "zh-cn":
             return zh_announcement
 
-        if "list" not in raw_data or "data" not in raw_data["list"]:
-            return None
-
-        # 在目标语言列表中查找对应的图片公告
-        ann_id = zh_announcement["ann_id"]
-        for item in raw_data["list"]["data"]["pic_list"]:
-            for type_item in item["type_list"]:
-                for announcement in type_item["list"]:
-                    if announcement["ann_id"] == ann_id:
-                        return announcement
-        return None
+        # 在目标语言图片公告索引中查找对应的公告（索引在parse开始时建立）
+        return self._target_pic_index.get(zh_announcement["ann_id"])
 
     def _get_time_from_zh_content(
         self, announcement: Dict, zh_content: Dict
     ) -> Tuple[str, str]:
         """从中文公告内容中提取时间信息（改进版）"""
+        # 获取公告中的原始时间，内容中提取不到时间时以此兜底
+        raw_start_time = self._timestamp_to_datetime(announcement.get("start_time", ""))
+        raw_end_time = self._timestamp_to_datetime(announcement.get("end_time", ""))
+        if self.debug:
+            self._debug_print(f"公告原始时间: {raw_start_time} 至 {raw_end_time}")
+
         if not zh_content or not isinstance(zh_content, dict):
             self._debug_print("无中文内容或内容格式错误")
-            return "", ""
+            return raw_start_time, raw_end_time
 
-        # 获取公告中的原始时间
-        start_time = self._timestamp_to_datetime(announcement.get("start_time", ""))
-        end_time = self._timestamp_to_datetime(announcement.get("end_time", ""))
-        self._debug_print(f"公告原始时间: {start_time} 至 {end_time}")
+        start_time, end_time = raw_start_time, raw_end_time
 
         # 判断是否是跃迁公告
         is_gacha = "跃迁" in zh_content.get("title", "")
@@ -562,73 +581,76 @@ class StarRailParser:
             if is_gacha:
                 # 跃迁公告时间提取
                 extracted_time = self._extract_sr_gacha_time(html_content)
+                end_time_part = ""
             else:
-                # 活动公告时间提取
-                extracted_time = self._extract_sr_event_time(html_content)
+                # 活动公告时间提取，开始和结束时间来自同一次匹配
+                extracted_time, end_time_part = self._extract_sr_event_time(
+                    html_content
+                )
 
             if extracted_time:
                 start_time = extracted_time
 
-                # 对于活动公告，尝试提取结束时间
-                if not is_gacha:
-                    end_time_part = self._extract_sr_event_end_time(html_content)
-                    if end_time_part:
-                        end_time = self._format_extracted_time(end_time_part)
+                # 对于活动公告，使用提取到的结束时间
+                if end_time_part:
+                    end_time = self._format_extracted_time(end_time_part)
+                    if self.debug and not end_time:
+                        self._debug_print(f"时间格式解析失败: {end_time_part}")
 
         # 处理版本更新后的特殊情况
         if f"{self.version_now}版本" in start_time or "版本更新后" in start_time:
             start_time = self.version_begin_time
             self._debug_print("检测到版本时间引用，使用版本开始时间")
 
-        return start_time, end_time
-
-    def _extract_sr_event_time(self, html_content: str) -> str:
-        """从活动公告HTML内容中提取开始时间"""
-        pattern = r"<h1[^>]*>(?:活动时间|限时活动期)</h1>\s*<p[^>]*>(.*?)</p>"
-        match = re.search(pattern, html_content, re.DOTALL)
-        self._debug_print(f"活动时间提取结果: {match}")
+        if not start_time:
+            start_time = raw_start_time
+            if self.debug:
+                self._debug_print(f"使用公告时间作为开始时间: {start_time}")
+        if not end_time:
+            end_time = raw_end_time
+            if self.debug:
+                self._debug_print(f"使用公告时间作为结束时间: {end_time}")
 
-        if match:
-            time_info = match.group(1)
-            cleaned_time_info = re.sub("&lt;.*?&gt;", "", time_info)
-            if "-" in cleaned_time_info:
-                return cleaned_time_info.split("-")[0].strip()
-            return cleaned_time_info
-        return ""
+        return start_time, end_time
 
-    def _extract_sr_event_end_time(self, html_content: str) -> str:
-        """从活动公告HTML内容中提取结束时间"""
-        pattern = r"<h1[^>]*>(?:活动时间|限时活动期)</h1>\s*<p[^>]*>(.*?)</p>"
-        match = re.search(pattern, html_content, re.DOTALL)
+    def _extract_sr_event_time(self, html_content: str) -> Tuple[str, str]:
+        """从活动公告HTML内容中提取开始时间和结束时间（只扫描一次HTML）"""
+        match = _RE_EVENT_TIME.search(html_content)
+        if self.debug:
+            self._debug_print(f"活动时间提取结果: {match}")
 
         if match:
             time_info = match.group(1)
-            cleaned_time_info = re.sub("&lt;.*?&gt;", "", time_info)
+            cleaned_time_info = self._remove_escaped_tags(time_info)
             if "-" in cleaned_time_info:
-                return cleaned_time_info.split("-")[1].strip()
-        return ""
+                parts = cleaned_time_info.split("-")
+                return parts[0].strip(), parts[1].strip()
+            return cleaned_time_info, ""
+        return "", ""
 
     def _extract_sr_gacha_time(self, html_content: str) -> str:
         """从跃迁公告HTML内容中提取时间"""
-        pattern = r"时间为(.*?)，包含如下内容"
-        matches = re.findall(pattern, html_content)
-        self._debug_print(f"跃迁时间提取结果: {matches}")
+        matches = _RE_GACHA_TIME.findall(html_content)
+        if self.debug:
+            self._debug_print(f"跃迁时间提取结果: {matches}")
 
         if matches:
-            time_range = re.sub("&lt;.*?&gt;", "", matches[0].strip())
+            time_range = self._remove_escaped_tags(matches[0].strip())
             if "-" in time_range:
                 return time_range.split("-")[0].strip()
             return time_range
         return ""
 
-    def _format_extracted_time(self, time_str: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _format_extracted_time(time_str: str) -> str:
         """格式化提取到的时间字符串"""
         if not time_str:
             return ""
 
         # 处理特殊时间格式
         time_str = time_str.replace("年", "/").replace("月", "/").replace("日", "")
-        time_str = re.sub(r"[^\d/ :]", "", time_str).strip()
+        time_str = _RE_NON_TIME_CHARS.sub("", time_str).strip()
 
         try:
             # 尝试解析格式 "2023/11/15 10:00:00"
@@ -640,24 +662,15 @@ class StarRailParser:
                 date_obj = datetime.strptime(time_str, "%Y/%m/%d %H:%M")
                 return date_obj.strftime("%Y-%m-%d %H:%M:%S")
             except ValueError:
-                self._debug_print(f"时间格式解析失败: {time_str}")
                 return ""
 
     def _is_valid_event(self, title: str) -> bool:
         """使用中文标题判断是否为有效活动公告"""
-        invalid_keywords = [
-            "跃迁",
-            "模拟宇宙",
-            "礼包",
-            "纪行",
-            "限时折扣",
-            "任务",
-            "音乐",
-        ]
-        is_valid = ("等奖励" in title) and not any(
-            kw in title for kw in invalid_keywords
+        is_valid = (
+            "等奖励" in title and _RE_INVALID_EVENT_KEYWORDS.search(title) is None
         )
-        self._debug_print(f"活动有效性检查: {'有效' if is_valid else '无效'}")
+        if self.debug:
+            self._debug_print(f"活动有效性检查: {'有效' if is_valid else '无效'}")
         return is_valid
 
     def _parse_content_time(self, time_str: str) -> str:
@@ -671,20 +684,34 @@ class StarRailParser:
             time_str = time_str.replace("年", "-").replace("月", "-").replace("日", "")
             date_obj = datetime.strptime(time_str, "%Y-%m-%d%H:%M")
             result = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-            self._debug_print(f"解析时间字符串成功: {time_str} -> {result}")
+            if self.debug:
+                self._debug_print(f"解析时间字符串成功: {time_str} -> {result}")
             return result
         except ValueError as e:
-            self._debug_print(f"解析时间字符串失败: {time_str}, 错误: {str(e)}")
+            if self.debug:
+                self._debug_print(f"解析时间字符串失败: {time_str}, 错误: {str(e)}")
             return ""
 
+    @staticmethod
+    def _unique(matches: Iterator[re.Match]) -> List[str]:
+        """取出每个匹配的第一个分组，按首次出现的顺序去重"""
+        seen = set()
+        result = []
+        for match in matches:
+            name = match.group(1)
+            if name not in seen:
+                seen.add(name)
+                result.append(name)
+        return result
+
     @staticmethod
     def _extract_version_number(text: str) -> List[float]:
         """从中文文本中提取版本号"""
-        version_pattern = r"(\d+\.\d+)"
-        versions = re.findall(version_pattern, text)
+        versions = _RE_VERSION.findall(text)
         return [float(v) for v in versions] if versions else []
 
     @staticmethod
+    @functools.lru_cache(maxsize=512)
     def _timestamp_to_datetime(timestamp: Union[str, int]) -> str:
         """将时间戳转换为日期时间字符串"""
         if not timestamp:
@@ -692,8 +719,12 @@ class StarRailParser:
 
         if isinstance(timestamp, str):
             try:
-                # 尝试解析格式如 "2023-11-15 10:00:00"
-                dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+                # 尝试解析格式如 "2023-11-15 10:00:00"；标准格式直接用fromisoformat校验，
+                # 其余写法（如月日不补零）仍交给strptime
+                if _RE_ISO_TIMESTAMP.fullmatch(timestamp):
+                    datetime.fromisoformat(timestamp)
+                else:
+                    datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
                 return timestamp
             except ValueError:
                 return ""
@@ -710,16 +741,27 @@ class StarRailParser:
         ann_id = announcement["ann_id"]
         zh_content = raw_data["zh_content_map"].get(ann_id, {})
         if zh_content and "title" in zh_content:
-            self._debug_print(f"从中文内容映射获取标题: {zh_content['title']}")
+            if self.debug:
+                self._debug_print(f"从中文内容映射获取标题: {zh_content['title']}")
             return zh_content["title"]
-        self._debug_print(f"使用默认标题: {announcement['title']}")
+        if self.debug:
+            self._debug_print(f"使用默认标题: {announcement['title']}")
         return announcement["title"]
 
     @staticmethod
     def _remove_html_tags(text: str) -> str:
         """移除HTML标签"""
-        clean = re.compile("<.*?>")
-        return re.sub(clean, "", text).strip()
+        # 标题大多不含标签，无需经过正则
+        if "<" not in text:
+            return text.strip()
+        return _RE_HTML_TAG.sub("", text).strip()
+
+    @staticmethod
+    def _remove_escaped_tags(text: str) -> str:
+        """移除转义后的HTML标签（如 &lt;t&gt;）"""
+        if "&lt;" not in text:
+            return text
+        return _RE_ESCAPED_TAG.sub("", text)
 
 
 # 使用示例
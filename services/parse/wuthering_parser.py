@@ -61,9 +61,10 @@ class WutheringParser:
         except ValueError:
             return ""
 
-    def _get_time_from_zh_content(self, activity: Dict) -> Tuple[str, str]:
+    def _get_time_from_zh_content(
+        self, activity: Dict, zh_content: Dict
+    ) -> Tuple[str, str]:
         """从中文内容中获取时间信息"""
-        zh_content = activity.get("zh_content", {})
         if not zh_content:
             return "", ""
 
@@ -102,7 +103,8 @@ class WutheringParser:
             raw_data: 从KuroFetcher获取的原始数据
                 {
                     "game": 游戏版本公告,
-                    "activity": 活动公告列表（包含详情内容）
+                    "items": 活动公告列表项,
+                    "contents": {语言代码: {活动ID: 详情内容}}
                 }
             lang: 语言代码，默认为简体中文(zh-Hans)
 
@@ -184,10 +186,12 @@ class WutheringParser:
         self, raw_data: Dict, result_list: List[Dict], lang: str
     ):
         """解析活动公告"""
-        if "activity" not in raw_data:
+        if "items" not in raw_data:
             return
 
-        for activity in raw_data["activity"]:
+        zh_contents = raw_data["contents"]["zh-Hans"]
+        lang_contents = raw_data["contents"].get(lang, zh_contents)
+        for activity in raw_data["items"]:
             if not isinstance(activity, dict):
                 continue
 
@@ -203,10 +207,11 @@ class WutheringParser:
             banner_image = banner_images[0] if banner_images else ""
 
             # 从中文内容获取时间
-            start_time, end_time = self._get_time_from_zh_content(activity)
+            zh_content = zh_contents.get(activity["id"], {})
+            start_time, end_time = self._get_time_from_zh_content(activity, zh_content)
 
             # 获取对应语言的内容
-            content = activity.get(f"{lang}_content", activity.get("zh_content", {}))
+            content = lang_contents.get(activity["id"], zh_content)
 
             parsed = {
                 "official_id": activity.get("id", ""),
@@ -224,10 +229,12 @@ class WutheringParser:
         self, raw_data: Dict, result_list: List[Dict], lang: str
     ):
         """解析唤取(抽卡)公告"""
-        if "activity" not in raw_data:
+        if "items" not in raw_data:
             return
 
-        for activity in raw_data["activity"]:
+        zh_contents = raw_data["contents"]["zh-Hans"]
+        lang_contents = raw_data["contents"].get(lang, zh_contents)
+        for activity in raw_data["items"]:
             if not isinstance(activity, dict):
                 continue
 
@@ -243,10 +250,11 @@ class WutheringParser:
             banner_image = banner_images[0] if banner_images else ""
 
             # 从中文内容获取时间
-            start_time, end_time = self._get_time_from_zh_content(activity)
+            zh_content = zh_contents.get(activity["id"], {})
+            start_time, end_time = self._get_time_from_zh_content(activity, zh_content)
 
             # 获取对应语言的内容
-            content = activity.get(f"{lang}_content", activity.get("zh_content", {}))
+            content = lang_contents.get(activity["id"], zh_content)
 
             # 解析内容生成标准化标题（仅简体中文）
             clean_title = (
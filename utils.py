@@ -1,8 +1,11 @@
 import base64
 import json
-from flask import jsonify
+from decimal import Decimal
+import orjson
+from flask import g, has_request_context, jsonify
+from flask.json.provider import JSONProvider
 from models import db, Game, User, UserData, RefreshLog
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 def decode_request_data(encoded_data):
@@ -21,6 +24,35 @@ def decode_request_data(encoded_data):
         raise ValueError(f"Failed to decode data: {str(e)}")
 
 
+def _orjson_default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """基于orjson的Flask JSON序列化（输出UTF-8，不转义非ASCII字符）"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def utc_now():
+    """当前UTC时间（naive，与数据库存储一致），同一请求内复用同一个值"""
+    if has_request_context():
+        if "now" not in g:
+            g.now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return g.now
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 def make_json_response(code=200, message="success", data=None):
     return jsonify({"code": code, "message": message, "data": data})
 
@@ -28,12 +60,13 @@ def make_json_response(code=200, message="success", data=None):
 def update_game_refresh_time(game_id, success=True):
     game = Game.query.filter_by(game_id=game_id).first()
     if game:
-        game.last_refresh = datetime.utcnow()
+        now = utc_now()
+        game.last_refresh = now
 
         log = RefreshLog(
             game_id=game_id,
             language="all",
-            refresh_time=datetime.utcnow(),
+            refresh_time=now,
             success=1 if success else 0,
         )
         db.session.add(log)